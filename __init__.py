@@ -1,10 +1,15 @@
+from anki import hooks
 from aqt import gui_hooks, mw
 from aqt.utils import qconnect
-from aqt.qt import QDialog, QAction
+from aqt.qt import QDialog, QAction, sip
 from .ui.game_selector import GameSelector
 from .games.memory_flip import MemoryFlipGame
 from .games.line_match import LineMatchGame
+from .games.line_rush import LineRushGame
+from .games.multiple_choice import MultipleChoiceGame
 from .ui.settings import open_settings
+from .ui.stats import open_stats
+from .games.pair_cache import pair_cache
 
 
 def launch_game(deck_id):
@@ -16,11 +21,25 @@ def launch_game(deck_id):
 
     if result == QDialog.DialogCode.Accepted:
         if selector.chosen_mode == "memory_flip":
-            game = MemoryFlipGame(deck_name)
-            game.exec()
+            run_game(MemoryFlipGame, deck_name)
         elif selector.chosen_mode == "line_match":
-            game = LineMatchGame(deck_name)
-            game.exec()
+            run_game(LineMatchGame, deck_name)
+        elif selector.chosen_mode == "line_rush":
+            run_game(LineRushGame, deck_name)
+        elif selector.chosen_mode == "multiple_choice":
+            run_game(MultipleChoiceGame, deck_name)
+    selector.deleteLater()
+
+
+def run_game(game_cls, deck_name):
+    play_again = True
+    while play_again:
+        game       = game_cls(deck_name)
+        game.exec()
+        play_again = game.play_again
+        # deleteLater would wait for the outer event loop, keeping every
+        # previous dialog alive while "Play Again" nests the next exec().
+        sip.delete(game)
 
 
 def add_game_option(menu, deck_id):
@@ -33,6 +52,14 @@ def add_settings_menu():
     qconnect(action.triggered, open_settings)
     mw.form.menuTools.addAction(action)
 
+    stats_action = QAction("AnkiGames Stats", mw)
+    qconnect(stats_action.triggered, open_stats)
+    mw.form.menuTools.addAction(stats_action)
+
 
 gui_hooks.deck_browser_will_show_options_menu.append(add_game_option)
-gui_hooks.main_window_did_init.append(add_settings_menu)
\ No newline at end of file
+gui_hooks.main_window_did_init.append(add_settings_menu)
+gui_hooks.operation_did_execute.append(pair_cache.on_operation)
+gui_hooks.collection_did_load.append(pair_cache.on_collection_load)
+gui_hooks.sync_did_finish.append(pair_cache.invalidate)
+hooks.notes_will_be_deleted.append(pair_cache.on_notes_deleted)
\ No newline at end of file
@@ -0,0 +1,140 @@
+import time
+from aqt.qt import QObject, QTimer
+from aqt.utils import qconnect
+
+
+class Animation:
+    def __init__(self, duration_ms: int, on_step, on_done=None, key=None):
+        self.duration_ms = max(1, duration_ms)
+        self.on_step     = on_step
+        self.on_done     = on_done
+        self.key         = key
+        self.started     = None
+
+    def step(self, now: float) -> bool:
+        if self.started is None:
+            self.started = now
+        t = min(1.0, (now - self.started) * 1000 / self.duration_ms)
+        self.on_step(t)
+        return t >= 1.0
+
+    def finish(self):
+        self.on_step(1.0)
+        if self.on_done:
+            self.on_done()
+
+
+class AnimationClock(QObject):
+    # One frame timer per dialog drives every animation and HUD update.
+    # The timer only runs while there is work queued, so an idle game costs nothing.
+    def __init__(self, parent, fps: int = 60):
+        super().__init__(parent)
+        self.animations    = []
+        self.pending_text  = {}
+        self.timers        = []
+        self.paused_timers = []
+        self.suspended     = False
+
+        self.frame = QTimer(self)
+        self.frame.setInterval(max(1, 1000 // max(1, fps)))
+        qconnect(self.frame.timeout, self._tick)
+
+    def add_timer(self, timer: QTimer):
+        self.timers.append(timer)
+
+    def remove_timer(self, timer: QTimer):
+        if timer in self.timers:
+            self.timers.remove(timer)
+        self.paused_timers = [entry for entry in self.paused_timers if entry[0] is not timer]
+
+    def start(self, animation: Animation):
+        if animation.key is not None:
+            self.finish(animation.key)
+
+        if self.suspended:
+            animation.finish()
+            return
+
+        # Take the first step right away so the input that started the
+        # animation is reflected in the very next paint, not a frame later.
+        if animation.step(time.monotonic()):
+            if animation.on_done:
+                animation.on_done()
+            return
+
+        self.animations.append(animation)
+        self._wake()
+
+    def finish(self, key):
+        running         = [a for a in self.animations if a.key == key]
+        self.animations = [a for a in self.animations if a.key != key]
+        for animation in running:
+            animation.finish()
+
+    def set_text(self, label, text: str):
+        self.pending_text[label] = text
+        if not self.suspended:
+            self._wake()
+
+    def suspend(self):
+        if self.suspended:
+            return
+        self.suspended = True
+        self.frame.stop()
+
+        running, self.animations = self.animations, []
+        for animation in running:
+            animation.finish()
+
+        self.paused_timers = [(t, t.remainingTime()) for t in self.timers if t.isActive()]
+        for timer, _ in self.paused_timers:
+            timer.stop()
+
+    def resume(self):
+        if not self.suspended:
+            return
+        self.suspended = False
+
+        # Single-shot delays pick up where they left off; repeating timers
+        # restart their interval.
+        for timer, remaining in self.paused_timers:
+            if timer.isSingleShot():
+                timer.start(max(0, remaining))
+            else:
+                timer.start()
+        self.paused_timers = []
+
+        if self.pending_text:
+            self._wake()
+
+    def stop(self):
+        self.frame.stop()
+        self.animations    = []
+        self.paused_timers = []
+        self._flush_text()
+        for timer in self.timers:
+            timer.stop()
+
+    def _wake(self):
+        if not self.frame.isActive():
+            self.frame.start()
+
+    def _tick(self):
+        now  = time.monotonic()
+        done = [a for a in self.animations if a.step(now)]
+        if done:
+            self.animations = [a for a in self.animations if a not in done]
+            for animation in done:
+                if animation.on_done:
+                    animation.on_done()
+
+        self._flush_text()
+
+        if not self.animations:
+            self.frame.stop()
+
+    def _flush_text(self):
+        pending, self.pending_text = self.pending_text, {}
+        for label, text in pending.items():
+            if label.text() != text:
+                label.setText(text)
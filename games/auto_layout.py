@@ -0,0 +1,48 @@
+import math
+import random
+from .card_face import measure_height
+
+REF_WIDTH    = 240
+QUANTILE     = 0.9
+MAX_SIDE     = 10
+SAMPLE_FACES = 200
+
+
+class TextDemand:
+    # A random sample of at most SAMPLE_FACES faces is laid out once, at the
+    # game's text size and a reference width, so opening a game costs the same
+    # on any deck size. Wrapped text keeps roughly the same area at other
+    # widths, so fitting a new window size is arithmetic over the stored area
+    # and never lays text out again. The area is a high quantile of the sample,
+    # so a batch drawn from anywhere in the deck stays legible.
+    def __init__(self, texts: list, family: str, px: int, rng=random):
+        if len(texts) > SAMPLE_FACES:
+            texts = rng.sample(texts, SAMPLE_FACES)
+        self.line_h = measure_height("X", family, REF_WIDTH, px)
+        areas       = sorted(measure_height(text, family, REF_WIDTH, px) * REF_WIDTH for text in texts)
+        self.area   = areas[min(len(areas) - 1, int(len(areas) * QUANTILE))] if areas else self.line_h * REF_WIDTH
+
+    def height_at(self, width: int) -> int:
+        return max(self.line_h, math.ceil(self.area / max(1, width)))
+
+
+def fit_grid(demand: TextDemand, width: int, height: int, spacing: int, pad: int,
+             min_w: int, min_h: int) -> tuple:
+    best, best_cells = (1, 2), 2
+    for cols in range(1, MAX_SIDE + 1):
+        cell_w = (width - spacing * (cols - 1)) // cols
+        if cell_w < min_w:
+            break
+        cell_h = max(min_h, demand.height_at(cell_w - pad) + pad)
+        rows   = min(MAX_SIDE, (height + spacing) // (cell_h + spacing))
+        cells  = rows * cols - rows * cols % 2
+        if cells > best_cells:
+            best, best_cells = (rows, cols), cells
+    return best
+
+
+def fit_rows(demand: TextDemand, width: int, height: int, spacing: int, pad: int,
+             min_h: int, max_rows: int) -> tuple:
+    row_h = max(min_h, demand.height_at(width - pad) + pad)
+    rows  = max(1, min(max_rows, (height + spacing) // (row_h + spacing)))
+    return rows, (height + spacing) // rows - spacing
@@ -0,0 +1,211 @@
+import random
+import time
+from aqt.qt import QDialog, QEvent, QTimer, Qt, sip
+from aqt.utils import askUser, qconnect
+from aqt import mw
+from .utils import load_config
+from .animation import AnimationClock
+from .latency import LatencyProbe
+from .history import record_session
+from .perf import PerfRecorder
+from .session import clear_session, load_session, save_session
+
+
+class BaseGameDialog(QDialog):
+    def __init__(self, mode: str, deck_name: str):
+        super().__init__(mw)
+        self.mode         = mode
+        self.session_deck = deck_name
+        self.pairs        = []
+        cfg               = load_config(("animation_fps", 60), ("animation_ms", 180), ("resume_sessions", True))
+        self.resumable    = cfg["resume_sessions"]
+        self.session      = self._take_session()
+        self.seed         = self.session["seed"] if self.session else random.randrange(1 << 30)
+        self.rng          = random.Random(self.seed)
+        self.restoring    = False
+        self.suspended    = False
+        self.animation_ms = cfg["animation_ms"]
+        self.animator     = AnimationClock(self, cfg["animation_fps"])
+        self.probe        = LatencyProbe(mode, deck_name)
+        self.perf         = PerfRecorder(mode, deck_name)
+        self.owned        = []
+        self.pending      = set()
+        self.play_again   = False
+        self.torn_down    = False
+
+    def own(self, widget):
+        widget.setParent(self)
+        self.owned.append(widget)
+        return widget
+
+    def disown(self, widget):
+        self.animator.finish(widget)
+        self.owned.remove(widget)
+        self._release(widget)
+        widget.deleteLater()
+
+    def after(self, ms: int, callback):
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        self.pending.add(timer)
+        self.animator.add_timer(timer)
+
+        def fire():
+            self.pending.discard(timer)
+            self.animator.remove_timer(timer)
+            timer.deleteLater()
+            callback()
+
+        qconnect(timer.timeout, fire)
+        timer.start(ms)
+        return timer
+
+    def _take_session(self):
+        if not self.resumable:
+            return None
+        session = load_session(self.mode, self.session_deck)
+        if session is None:
+            return None
+        if askUser("Resume your unfinished game on this deck?", parent=mw, title="AnkiGames"):
+            return session
+        clear_session(self.mode, self.session_deck)
+        return None
+
+    def _start_game(self):
+        if self.session is None:
+            self.state.load_batch()
+            return
+        self.seconds   = self.session["seconds"]
+        self.restoring = True
+        self.state.restore(self.session["state"])
+        self.restoring = False
+        self._refresh_hud()
+
+    def _suspend(self):
+        # An unfinished game is written out instead of recorded, so history
+        # only sees it once, when the resumed game ends.
+        state = getattr(self, "state", None)
+        if state is None:
+            return
+        if state.scheduler.remaining == 0:
+            clear_session(self.mode, self.session_deck)
+            return
+        if not self.resumable or state.moves == 0:
+            return
+        # Only pairs still in play are saved. Misses on finished pairs are
+        # kept by front so history still gets them when the game ends.
+        keep = state.scheduler.live()
+        done = sorted(set(range(len(self.pairs))) - set(keep))
+        save_session(self.mode, self.session_deck, {
+            "seed":    self.seed,
+            "seconds": getattr(self, "seconds", 0),
+            "pairs":   [self.pairs[pair] for pair in keep],
+            "missed":  self._misses(done),
+            "state":   state.snapshot(self._layout(), keep),
+        })
+        self.suspended = True
+
+    def _layout(self) -> list:
+        return []
+
+    def _refresh_hud(self):
+        pass
+
+    def done(self, result):
+        self._teardown()
+        super().done(result)
+
+    def _teardown(self):
+        if self.torn_down:
+            return
+        self.torn_down = True
+        self.animator.stop()
+        self.probe.save()
+        self.perf.save()
+        self._suspend()
+        self._record()
+        self._cancel_pending()
+
+        for widget in self.owned:
+            if not sip.isdeleted(widget):
+                self._release(widget)
+                widget.deleteLater()
+        self.owned = []
+
+    def _cancel_pending(self):
+        for timer in self.pending:
+            timer.stop()
+            self.animator.remove_timer(timer)
+            timer.deleteLater()
+        self.pending = set()
+
+    def _release(self, widget):
+        pass
+
+    def _pairs_played(self) -> int:
+        return len(self.state.scheduler.groups)
+
+    def _misses(self, pairs) -> dict:
+        misses = dict(self.session["missed"]) if self.session else {}
+        for pair in pairs:
+            count = self.state.scheduler.misses[pair]
+            if count:
+                front         = self.pairs[pair][0]
+                misses[front] = misses.get(front, 0) + count
+        return misses
+
+    def _record(self):
+        state = getattr(self, "state", None)
+        if state is None or state.moves == 0 or self.suspended:
+            return
+        scheduler = state.scheduler
+        misses    = self._misses(range(min(len(self.pairs), len(scheduler.misses))))
+        record_session(
+            mode     = self.mode,
+            deck     = self.session_deck,
+            moves    = state.moves,
+            correct  = state.correct_moves,
+            seconds  = getattr(self, "seconds", 0),
+            pairs    = self._pairs_played(),
+            finished = scheduler.remaining == 0,
+            misses   = misses,
+        )
+
+    def keyPressEvent(self, event):
+        try:
+            key = Qt.Key(event.key())
+        except ValueError:
+            key = None
+        if self._handle_key(key, event.text()):
+            event.accept()
+            return
+        super().keyPressEvent(event)
+
+    def _handle_key(self, key, text: str) -> bool:
+        return False
+
+    def event(self, event):
+        perf = getattr(self, "perf", None)
+        if perf is None or not perf.enabled or event.type() != QEvent.Type.UpdateRequest:
+            return super().event(event)
+        start  = time.perf_counter()
+        result = super().event(event)
+        perf.add("paint", (time.perf_counter() - start) * 1000)
+        return result
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.isMinimized():
+            self.animator.resume()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.animator.suspend()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.isMinimized():
+                self.animator.suspend()
+            elif self.isVisible():
+                self.animator.resume()
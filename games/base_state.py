@@ -1,38 +1,131 @@
 from aqt.qt import QTimer
+from .scheduler import SessionScheduler
+
+
+class CardPool:
+    # The cards of a game, by index: pair p owns indices p * cards_per_pair
+    # onwards. Cards are built the first time they are dealt and dropped once
+    # the scheduler is done with their pair, so a game on a large deck only
+    # holds the widgets of the rounds in play.
+    def __init__(self, groups: list, cards_per_pair: int, build, drop=None):
+        self.groups   = groups
+        self.count    = len(groups) * cards_per_pair
+        self.build    = build
+        self.drop     = drop
+        self.built    = {}
+        self.index_of = {}
+
+    @classmethod
+    def of(cls, cards: list, cards_per_pair: int):
+        return cls([card.pair_id for card in cards[::cards_per_pair]], cards_per_pair, cards.__getitem__)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int):
+        card = self.built.get(i)
+        if card is None:
+            card                    = self.build(i)
+            self.built[i]           = card
+            self.index_of[id(card)] = i
+        return card
+
+    def index(self, card) -> int:
+        return self.index_of[id(card)]
+
+    def release(self, i: int):
+        card = self.built.pop(i, None)
+        if card is None:
+            return
+        del self.index_of[id(card)]
+        if self.drop:
+            self.drop(card)
 
 
 class BaseState:
-    def __init__(self, cards, cards_per_batch, on_batch_done, on_game_done, on_move):
-        self.cards           = cards
+    cards_per_pair = 2
+
+    def __init__(self, cards, cards_per_batch, on_batch_done, on_game_done, on_move, schedule=None, on_input=None, gap=1):
+        self.cards           = cards if isinstance(cards, CardPool) else CardPool.of(cards, self.cards_per_pair)
         self.cards_per_batch = cards_per_batch
         self.on_batch_done   = on_batch_done
         self.on_game_done    = on_game_done
         self.on_move         = on_move
+        self.schedule        = schedule or QTimer.singleShot
+        self.on_input        = on_input
         self.card1           = None
         self.card2           = None
         self.input_locked    = False
-        self.batch_index     = 0
         self.pairs_up        = 0
         self.moves           = 0
         self.correct_moves   = 0
+        self.matched         = set()
+        self.scheduler       = SessionScheduler(self.cards.groups, gap)
 
     def load_batch(self):
-        if self.batch_index >= len(self.cards):
+        finished = [pair for pair in self.scheduler.current if pair not in self.scheduler.missed]
+        if self.scheduler.done():
             self.on_game_done()
             return
 
-        batch             = self.cards[self.batch_index: self.batch_index + self.cards_per_batch]
-        self.batch_index += len(batch)
-        self.pairs_up     = len(batch) // 2
+        pairs             = self.scheduler.next_batch(self.cards_per_batch // self.cards_per_pair)
+        batch             = [card for p in pairs for card in self._cards_of(p)]
+        self.pairs_up     = len(pairs)
+        self.matched      = set()
         self.card1        = None
         self.card2        = None
         self.input_locked = False
         self.on_batch_done(batch)
 
+        for pair in finished:
+            for i in self._indices_of(pair):
+                self.cards.release(i)
+
+    def snapshot(self, layout, keep: list = None) -> dict:
+        pos = self._positions(keep)
+        return {
+            "moves":     self.moves,
+            "correct":   self.correct_moves,
+            "matched":   sorted(pos[pair] for pair in self.matched),
+            "layout":    [self._renumber(self.cards.index(card), pos) for card in layout],
+            "scheduler": self.scheduler.snapshot(keep),
+        }
+
+    def _positions(self, keep) -> dict:
+        pairs = range(len(self.cards) // self.cards_per_pair) if keep is None else keep
+        return {pair: i for i, pair in enumerate(pairs)}
+
+    def _renumber(self, index: int, pos: dict) -> int:
+        return pos[index // self.cards_per_pair] * self.cards_per_pair + index % self.cards_per_pair
+
+    def restore(self, data: dict):
+        self.scheduler.restore(data["scheduler"])
+        self.moves         = data["moves"]
+        self.correct_moves = data["correct"]
+        self.matched       = set(data["matched"])
+        self.pairs_up      = len(self.scheduler.current) - len(self.matched)
+        self.card1         = None
+        self.card2         = None
+        self.input_locked  = False
+
+        if self.pairs_up == 0:
+            self.load_batch()
+            return
+        self.on_batch_done([self.cards[i] for i in data["layout"]])
+
+    def is_matched(self, card) -> bool:
+        return self.pair_of(card) in self.matched
+
+    def pair_of(self, card) -> int:
+        return self.cards.index(card) // self.cards_per_pair
+
     def put_card(self, card):
         if self.input_locked:
             return
 
+        if self.on_input:
+            self.on_input()
+
         if self.card1 is None:
             self.card1 = card
             self._on_select_first(card)
@@ -45,6 +138,16 @@ class BaseState:
         self.on_move()
         self._check_match()
 
+    def _cards_of(self, pair):
+        return [self.cards[i] for i in self._indices_of(pair)]
+
+    def _indices_of(self, pair):
+        return range(pair * self.cards_per_pair, (pair + 1) * self.cards_per_pair)
+
+    def _miss(self, *cards):
+        for card in cards:
+            self.scheduler.miss(self.pair_of(card))
+
     def _on_select_first(self, card):
         pass
 
@@ -58,6 +161,7 @@ class BaseState:
         return self.card1.pair_id == self.card2.pair_id
 
     def _after_correct(self):
+        self.matched.add(self.pair_of(self.card1))
         self.correct_moves += 1
         self.card1         = None
         self.card2         = None
@@ -65,9 +169,13 @@ class BaseState:
         self.input_locked  = False
 
         if self.pairs_up == 0:
-            QTimer.singleShot(500, self.load_batch)
+            self.schedule(500, self.load_batch)
+
+    def _missed_cards(self, c1, c2):
+        return c1, c2
 
     def _after_wrong(self, c1, c2, delay_ms, callback):
+        self._miss(*self._missed_cards(c1, c2))
         self.card1 = None
         self.card2 = None
-        QTimer.singleShot(delay_ms, lambda: callback(c1, c2))
\ No newline at end of file
+        self.schedule(delay_ms, lambda: callback(c1, c2))
\ No newline at end of file
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from functools import lru_cache
+from aqt.qt import (QTextDocument, QTextOption, QAbstractTextDocumentLayout, QPalette,
+                    QPixmap, QPainter, QColor, QFont, Qt)
+
+MIN_FONT_PX = 9
+CACHE_BYTES = 48 * 1024 * 1024
+
+resource_loaders = {}
+
+
+class FaceCache:
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.used_bytes  = 0
+        self.entries     = OrderedDict()
+
+    def get(self, key):
+        pixmap = self.entries.get(key)
+        if pixmap is not None:
+            self.entries.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap: QPixmap):
+        self.entries[key] = pixmap
+        self.used_bytes  += _pixmap_bytes(pixmap)
+        while self.used_bytes > self.limit_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.used_bytes -= _pixmap_bytes(old)
+
+    def clear(self):
+        self.entries.clear()
+        self.used_bytes = 0
+
+
+_faces = FaceCache(CACHE_BYTES)
+
+
+class FaceDocument(QTextDocument):
+    def loadResource(self, kind, url):
+        loader = resource_loaders.get(url.scheme())
+        if loader is not None:
+            resource = loader(url)
+            if resource is not None:
+                return resource
+        return super().loadResource(kind, url)
+
+
+def _pixmap_bytes(pixmap: QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * 4
+
+
+def _make_document(text: str, family: str, px: int, width: int) -> QTextDocument:
+    font = QFont(family)
+    font.setPixelSize(px)
+
+    option = QTextOption(Qt.AlignmentFlag.AlignHCenter)
+    option.setWrapMode(QTextOption.WrapMode.WordWrap)
+
+    doc = FaceDocument()
+    doc.setDefaultFont(font)
+    doc.setDocumentMargin(0)
+    doc.setDefaultTextOption(option)
+    if "<img" in text:
+        doc.setHtml(text)
+    else:
+        doc.setPlainText(text)
+    doc.setTextWidth(width)
+    return doc
+
+
+@lru_cache(maxsize=4096)
+def fit_font_size(text: str, family: str, width: int, height: int, max_px: int) -> int:
+    lo, hi, best = MIN_FONT_PX, max_px, MIN_FONT_PX
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        doc = _make_document(text, family, mid, width)
+        if doc.idealWidth() <= width and doc.size().height() <= height:
+            best, lo = mid, mid + 1
+        else:
+            hi = mid - 1
+    return best
+
+
+@lru_cache(maxsize=4096)
+def measure_height(text: str, family: str, width: int, px: int) -> int:
+    return int(_make_document(text, family, px, width).size().height()) + 1
+
+
+def render_face(text: str, family: str, width: int, height: int, max_px: int,
+                dpr: float = 1.0, color: str = "white") -> QPixmap:
+    key    = (text, family, width, height, max_px, dpr, color)
+    pixmap = _faces.get(key)
+    if pixmap is not None:
+        return pixmap
+
+    px  = fit_font_size(text, family, width, height, max_px)
+    doc = _make_document(text, family, px, width)
+
+    pixmap = QPixmap(int(width * dpr), int(height * dpr))
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.GlobalColor.transparent)
+
+    ctx     = QAbstractTextDocumentLayout.PaintContext()
+    palette = ctx.palette
+    palette.setColor(QPalette.ColorRole.Text, QColor(color))
+    ctx.palette = palette
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    painter.translate(0, max(0, (height - doc.size().height()) / 2))
+    doc.documentLayout().draw(painter, ctx)
+    painter.end()
+
+    _faces.put(key, pixmap)
+    return pixmap
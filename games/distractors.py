@@ -0,0 +1,84 @@
+import heapq
+import random
+from collections import defaultdict
+from .utils import normalize_face, load_deck_pairs
+from .pair_cache import pair_cache
+
+NGRAM       = 3
+MAX_POSTING = 200
+
+_indexes = {}
+
+
+def ngrams(text: str) -> frozenset:
+    text = f" {normalize_face(text)} "
+    if len(text) <= NGRAM:
+        return frozenset([text])
+    return frozenset(text[i: i + NGRAM] for i in range(len(text) - NGRAM + 1))
+
+
+class DistractorIndex:
+    # Inverted index from character trigrams to every back in the deck. A query
+    # only walks the postings of the answer's own trigrams, and trigrams shared
+    # by more than MAX_POSTING backs are dropped, so lookups never scan the deck.
+    def __init__(self, pairs: list):
+        self.backs     = [back for _, back, _ in pairs]
+        self.groups    = [group for _, _, group in pairs]
+        self.keys      = [normalize_face(back) for back in self.backs]
+        self.grams     = [ngrams(back) for back in self.backs]
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self.postings  = defaultdict(list)
+
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(i)
+
+        self.postings = {gram: ids for gram, ids in self.postings.items() if len(ids) <= MAX_POSTING}
+
+    def query(self, back: str, k: int, rng=random) -> list:
+        key   = normalize_face(back)
+        i     = self.positions.get(key)
+        group = self.groups[i] if i is not None else None
+        grams = self.grams[i] if i is not None else ngrams(back)
+
+        shared = defaultdict(int)
+        for gram in grams:
+            for j in self.postings.get(gram, ()):
+                shared[j] += 1
+
+        ranked = heapq.nlargest(
+            k * 4,
+            ((count / (len(grams) + len(self.grams[j]) - count), j) for j, count in shared.items()),
+        )
+
+        seen   = {key}
+        picked = []
+        for _, j in ranked:
+            if len(picked) == k:
+                break
+            if self.groups[j] != group and self.keys[j] not in seen:
+                seen.add(self.keys[j])
+                picked.append(self.backs[j])
+
+        attempts = k * 10
+        while len(picked) < k and attempts > 0 and self.backs:
+            attempts -= 1
+            j = rng.randrange(len(self.backs))
+            if self.groups[j] != group and self.keys[j] not in seen:
+                seen.add(self.keys[j])
+                picked.append(self.backs[j])
+        return picked
+
+
+def index_for(deck_name: str, pairs: list = None) -> DistractorIndex:
+    # With `pairs` given, a stale or missing deck index is replaced by one over
+    # just those pairs instead of querying the whole deck. It is not cached.
+    cached = _indexes.get(deck_name)
+    if cached and cached[0] == pair_cache.generation:
+        return cached[1]
+    if pairs is not None:
+        return DistractorIndex(pairs)
+
+    index = DistractorIndex(load_deck_pairs(deck_name))
+    _indexes[deck_name] = (pair_cache.generation, index)
+    return index
@@ -0,0 +1,186 @@
+import os
+import re
+import sqlite3
+from anki.utils import ids2str
+from aqt.qt import QImage, QBuffer, QIODevice, QUrl, Qt
+from aqt.operations import QueryOp
+from aqt import mw
+from .utils import load_config, user_file, prepare_field, PairIndex, spread_groups, load_pairs
+from . import card_face
+
+PACK_VERSION = 1
+MEDIA_SIZE   = (360, 260)
+MMAP_BYTES   = 64 * 1024 * 1024
+
+_open_packs = {}
+_images     = {}
+_building   = set()
+
+
+def open_pairs(deck_name: str, batch_pairs: int = 0) -> list:
+    config = load_config(("game_packs", False), ("useReviewQueue", False), ("maxCards", None))
+    if not config["game_packs"] or config["useReviewQueue"]:
+        return load_pairs(deck_name, batch_pairs)
+
+    did   = mw.col.decks.id_for_name(deck_name)
+    pairs = read_pack(did, config["maxCards"])
+    if pairs is None:
+        rebuild_in_background(did, deck_name)
+        return load_pairs(deck_name, batch_pairs)
+    return spread_groups(pairs, batch_pairs)
+
+
+def pack_path(did: int) -> str:
+    folder = user_file("packs")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{did}.db")
+
+
+def deck_stamp(did: int) -> str:
+    dids = mw.col.decks.deck_and_child_ids(did)
+    row  = mw.col.db.first(
+        "select max(n.mod), count(distinct n.id), sum(distinct n.id) "
+        f"from cards c join notes n on c.nid = n.id where c.did in {ids2str(dids)}"
+    )
+    return f"{PACK_VERSION}:{mw.col.media.dir()}:{row[0]}:{row[1]}:{row[2]}"
+
+
+def read_pack(did: int, max_cards) -> list:
+    conn = _connect(did)
+    if conn is None:
+        return None
+
+    stamp = conn.execute("select value from meta where key = 'stamp'").fetchone()
+    if stamp is None or stamp[0] != deck_stamp(did):
+        return None
+
+    limit = max_cards if max_cards is not None else -1
+    rows  = conn.execute("select front, back, grp from pairs order by random() limit ?", (limit,)).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def rebuild_in_background(did: int, deck_name: str):
+    if did in _building:
+        return
+    _building.add(did)
+
+    def done(tmp_path):
+        _building.discard(did)
+        _close(did)
+        os.replace(tmp_path, pack_path(did))
+
+    def failed(err):
+        _building.discard(did)
+
+    QueryOp(
+        parent  = mw,
+        op      = lambda col: _build_pack(did, deck_name),
+        success = done,
+    ).failure(failed).run_in_background()
+
+
+def _build_pack(did: int, deck_name: str) -> str:
+    stamp    = deck_stamp(did)
+    tmp_path = pack_path(did) + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    index = PairIndex()
+    for nid in mw.col.find_notes(f'deck:"{deck_name}"'):
+        note  = mw.col.get_note(nid)
+        front = prepare_field(note.fields[0])
+        back  = prepare_field(note.fields[1])
+        if front and back:
+            index.add(front, back)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript("""
+        create table meta  (key text primary key, value text);
+        create table pairs (pos integer primary key, front text, back text, grp integer);
+        create table media (name text primary key, data blob);
+    """)
+
+    media = {}
+    rows  = []
+    for pos, (front, back, grp) in enumerate(index.grouped()):
+        rows.append((pos, _pack_media(did, front, media), _pack_media(did, back, media), grp))
+
+    conn.executemany("insert into pairs values (?, ?, ?, ?)", rows)
+    conn.executemany("insert into media values (?, ?)", media.items())
+    conn.execute("insert into meta values ('stamp', ?)", (stamp,))
+    conn.commit()
+    conn.close()
+    return tmp_path
+
+
+def _pack_media(did: int, text: str, media: dict) -> str:
+    def swap(match):
+        path = match.group(1)
+        name = os.path.basename(path)
+        if name not in media:
+            data = _downscale(path)
+            if data is None:
+                return match.group(0)
+            media[name] = data
+        return f'src="pack://{did}/{name}"'
+
+    return re.sub(r'src="([^"]+)"', swap, text)
+
+
+def _downscale(path: str) -> bytes:
+    image = QImage(path)
+    if image.isNull():
+        return None
+    if image.width() > MEDIA_SIZE[0] or image.height() > MEDIA_SIZE[1]:
+        image = image.scaled(MEDIA_SIZE[0], MEDIA_SIZE[1],
+                             Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(buffer.data())
+
+
+def _connect(did: int):
+    conn = _open_packs.get(did)
+    if conn is not None:
+        return conn
+
+    path = pack_path(did)
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute(f"pragma mmap_size = {MMAP_BYTES}")
+    except sqlite3.Error:
+        return None
+    _open_packs[did] = conn
+    return conn
+
+
+def _close(did: int):
+    conn = _open_packs.pop(did, None)
+    if conn is not None:
+        conn.close()
+    for key in [k for k in _images if k[0] == did]:
+        del _images[key]
+
+
+def _load_image(url):
+    try:
+        did = int(url.host())
+    except ValueError:
+        return None
+    key = (did, url.path(QUrl.ComponentFormattingOption.FullyDecoded).lstrip("/"))
+    if key in _images:
+        return _images[key]
+
+    conn = _connect(did)
+    if conn is None:
+        return None
+    row = conn.execute("select data from media where name = ?", (key[1],)).fetchone()
+    _images[key] = QImage.fromData(row[0]) if row else None
+    return _images[key]
+
+
+card_face.resource_loaders["pack"] = _load_image
@@ -0,0 +1,110 @@
+import sqlite3
+import time
+from .utils import user_file
+
+HISTORY_NAME = "history.db"
+
+SCHEMA = """
+    create table if not exists sessions (
+        id       integer primary key,
+        at       integer not null,
+        deck     text    not null,
+        mode     text    not null,
+        moves    integer not null,
+        correct  integer not null,
+        seconds  integer not null,
+        pairs    integer not null,
+        finished integer not null
+    );
+    create table if not exists misses (
+        session integer not null,
+        deck    text    not null,
+        card    text    not null,
+        misses  integer not null
+    );
+    create index if not exists ix_sessions_deck_mode on sessions (deck, mode, at);
+    create index if not exists ix_misses_deck_card   on misses (deck, card);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(user_file(HISTORY_NAME))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_session(mode: str, deck: str, moves: int, correct: int, seconds: int,
+                   pairs: int, finished: bool, misses: dict):
+    conn = _connect()
+    with conn:
+        cur = conn.execute(
+            "insert into sessions (at, deck, mode, moves, correct, seconds, pairs, finished) "
+            "values (?, ?, ?, ?, ?, ?, ?, ?)",
+            (int(time.time()), deck, mode, moves, correct, seconds, pairs, int(finished)),
+        )
+        conn.executemany(
+            "insert into misses values (?, ?, ?, ?)",
+            [(cur.lastrowid, deck, card, count) for card, count in misses.items()],
+        )
+    conn.close()
+
+
+# Every aggregate below runs as one grouped SQL query over the whole history,
+# so the dashboard never loops over sessions in Python.
+
+def _where(deck, mode):
+    clauses, args = [], []
+    if deck:
+        clauses.append("deck = ?")
+        args.append(deck)
+    if mode:
+        clauses.append("mode = ?")
+        args.append(mode)
+    return (" where " + " and ".join(clauses) if clauses else ""), args
+
+
+def decks() -> list:
+    conn = _connect()
+    rows = conn.execute("select distinct deck from sessions order by deck").fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def summary(deck: str = None) -> list:
+    where, args = _where(deck, None)
+    conn = _connect()
+    rows = conn.execute(
+        "select deck, mode, count(*), sum(finished), "
+        "100.0 * sum(correct) / max(sum(moves), 1), "
+        "1.0 * sum(seconds) / max(sum(pairs), 1) "
+        f"from sessions{where} group by deck, mode order by deck, mode",
+        args,
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def trend(deck: str = None, mode: str = None) -> list:
+    where, args = _where(deck, mode)
+    conn = _connect()
+    rows = conn.execute(
+        "select strftime('%Y-%m', at, 'unixepoch', 'localtime') as month, count(*), "
+        "100.0 * sum(correct) / max(sum(moves), 1), "
+        "1.0 * sum(seconds) / max(sum(pairs), 1) "
+        f"from sessions{where} group by month order by month",
+        args,
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def hardest_cards(deck: str = None, limit: int = 20) -> list:
+    where, args = _where(deck, None)
+    conn = _connect()
+    rows = conn.execute(
+        f"select card, deck, sum(misses) as total, count(*) from misses{where} "
+        "group by deck, card order by total desc limit ?",
+        args + [limit],
+    ).fetchall()
+    conn.close()
+    return rows
@@ -0,0 +1,65 @@
+import time
+from .utils import append_jsonl
+
+BUCKETS_MS   = [2, 4, 8, 16, 33, 50, 100, 250]
+LOG_NAME     = "latency.jsonl"
+LOG_SESSIONS = 500
+
+
+class LatencyProbe:
+    # Measures the time from an input event to the first repaint after it.
+    def __init__(self, mode: str, deck_name: str):
+        self.mode      = mode
+        self.deck_name = deck_name
+        self.counts    = [0] * (len(BUCKETS_MS) + 1)
+        self.samples   = 0
+        self.total_ms  = 0.0
+        self.max_ms    = 0.0
+        self.started   = None
+
+    def begin(self):
+        self.started = time.perf_counter()
+
+    def painted(self):
+        if self.started is None:
+            return
+        elapsed_ms   = (time.perf_counter() - self.started) * 1000
+        self.started = None
+
+        bucket = 0
+        while bucket < len(BUCKETS_MS) and elapsed_ms > BUCKETS_MS[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.samples        += 1
+        self.total_ms       += elapsed_ms
+        self.max_ms          = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction: float) -> int:
+        if not self.samples:
+            return 0
+        target = fraction * self.samples
+        seen   = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return BUCKETS_MS[bucket] if bucket < len(BUCKETS_MS) else int(self.max_ms)
+        return int(self.max_ms)
+
+    def summary(self) -> dict:
+        return {
+            "mode":       self.mode,
+            "deck":       self.deck_name,
+            "at":         int(time.time()),
+            "samples":    self.samples,
+            "mean_ms":    round(self.total_ms / self.samples, 2) if self.samples else 0,
+            "p50_ms":     self.percentile(0.5),
+            "p95_ms":     self.percentile(0.95),
+            "max_ms":     round(self.max_ms, 2),
+            "buckets_ms": BUCKETS_MS,
+            "counts":     self.counts,
+        }
+
+    def save(self):
+        if not self.samples:
+            return
+        append_jsonl(LOG_NAME, self.summary(), LOG_SESSIONS)
@@ -1,13 +1,23 @@
 import json
 import os
-import random
 from aqt.qt import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTimer,
-    QPushButton, QWidget, Qt, QPainter, QPen, QColor, QPoint
+    QVBoxLayout, QHBoxLayout, QLabel, QTimer,
+    QPushButton, QWidget, Qt, QPainter, QPen, QColor, QPoint, QSize
 )
 from aqt.utils import qconnect
-from aqt import mw
-from .utils import load_pairs
+from .game_pack import open_pairs
+from .base_dialog import BaseGameDialog
+from .animation import Animation
+from .card_face import render_face, measure_height
+from .base_state import BaseState, CardPool
+from .auto_layout import TextDemand, fit_rows
+
+LINE_MAX_FONT_PX = 22
+LINE_TEXT_PX     = 18
+LINE_LABEL_PAD   = 20
+LINE_MIN_H       = 60
+AUTO_LINE_MAX_W  = 560
+AUTO_LINE_ROWS   = 10
 
 
 def load_config():
@@ -17,24 +27,69 @@ def load_config():
     return {
         "numberOfPairs": config.get("numberOfPairs", 4),
         "line_wrong_ms": config.get("line_wrong_ms", 800),
+        "requeue_gap":   config.get("requeue_gap", 1),
+        "auto_layout":   config.get("auto_layout", False),
     }
 
 
 class LineLabel(QLabel):
     def __init__(self, text: str, pair_id: int, on_click):
         super().__init__()
+        self.text_value = text
         self.pair_id    = pair_id
         self.is_matched = False
         self.on_click   = on_click
         self.side       = None
+        self.animator   = None
+        self.probe      = None
+        self.hotkey     = ""
+        self.has_cursor = False
+        self.fade_ms    = 0
+        self._glow      = 0.0
+        self._dropped   = False
 
-        self.setText(text)
-        self.setWordWrap(True)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.setMinimumSize(150, 60)
+        self.setMinimumSize(150, LINE_MIN_H)
         self.setMaximumSize(300, 120)
         self._apply_style("default")
 
+    def sizeHint(self) -> QSize:
+        margins = self.width() - self.contentsRect().width() if self.width() else LINE_LABEL_PAD
+        text_w  = self.maximumWidth() - margins
+        height  = measure_height(self.text_value, self.font().family(), text_w, LINE_TEXT_PX) + margins
+        return QSize(self.maximumWidth(), max(self.minimumHeight(), min(self.maximumHeight(), height)))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._show_face()
+
+    def set_face(self, text: str, pair_id: int):
+        # Swaps the card shown in place. The label keeps its size, so the
+        # column layout is not asked to recompute.
+        self.text_value = text
+        self.pair_id    = pair_id
+        self.reset()
+        self._show_face()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._dropped:
+            self._show_face()
+
+    def drop_face(self):
+        # Hidden labels give their face pixmap back and render it again when
+        # shown, at the size they last had.
+        self._dropped = True
+        self.clear()
+
+    def _show_face(self):
+        self._dropped = False
+        rect = self.contentsRect()
+        if rect.width() <= 0 or rect.height() <= 0:
+            return
+        self.setPixmap(render_face(self.text_value, self.font().family(), rect.width(), rect.height(),
+                                   LINE_MAX_FONT_PX, self.devicePixelRatioF()))
+
     def mousePressEvent(self, event):
         if not self.is_matched and self.on_click:
             self.on_click(self)
@@ -46,9 +101,56 @@ class LineLabel(QLabel):
     def set_selected(self):
         self._apply_style("selected")
 
+    def reset(self):
+        if self.animator:
+            self.animator.finish(self)
+        self.is_matched = False
+        self._glow      = 0.0
+        self._apply_style("default")
+
+    def set_cursor(self, on: bool):
+        self.has_cursor = on
+        self.update()
+
+    def paintEvent(self, event):
+        if self.probe:
+            self.probe.painted()
+
+        super().paintEvent(event)
+        if self._glow <= 0.0 and not self.has_cursor and not self.hotkey:
+            return
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        if self._glow > 0.0:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(74, 255, 74, int(110 * self._glow)))
+            painter.drawRoundedRect(self.rect(), 6, 6)
+
+        if self.has_cursor:
+            painter.setPen(QPen(QColor("#FFC107"), 3))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRoundedRect(self.rect().adjusted(1, 1, -1, -1), 6, 6)
+
+        if self.hotkey and not self.is_matched:
+            painter.setPen(QColor("#aaa"))
+            painter.drawText(self.rect().adjusted(6, 3, -6, -3),
+                             Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft, self.hotkey)
+
+        painter.end()
+
     def set_matched(self):
         self.is_matched = True
         self._apply_style("matched")
+        if self.animator is None or self.fade_ms <= 0:
+            return
+
+        def step(t):
+            self._glow = 1.0 - t
+            self.update()
+
+        self.animator.start(Animation(self.fade_ms, step, key=self))
 
     def deselect(self):
         self._apply_style("default")
@@ -70,21 +172,37 @@ class LineCanvas(QWidget):
         self.setStyleSheet("background: transparent;")
         self.green_lines = []
         self.red_line    = None
+        self.animator    = None
+        self.draw_ms     = 0
+
+        self.red_timer = QTimer(self)
+        self.red_timer.setSingleShot(True)
+        qconnect(self.red_timer.timeout, self._clear_red)
 
     def add_green(self, p1, p2):
-        self.green_lines.append((p1, p2))
-        self.update()
+        line = [p1, p2, 1.0]
+        self.green_lines.append(line)
+        if self.animator is None or self.draw_ms <= 0:
+            self.update()
+            return
+
+        def step(t):
+            line[2] = t
+            self.update()
+
+        self.animator.start(Animation(self.draw_ms, step))
 
     def flash_red(self, p1, p2, wrong_ms=800):
         self.red_line = (p1, p2)
         self.update()
-        QTimer.singleShot(wrong_ms, self._clear_red)
+        self.red_timer.start(wrong_ms)
 
     def _clear_red(self):
         self.red_line = None
         self.update()
 
     def clear_all(self):
+        self.red_timer.stop()
         self.green_lines = []
         self.red_line    = None
         self.update()
@@ -95,7 +213,10 @@ class LineCanvas(QWidget):
 
         pen = QPen(QColor("#4aff4a"), 3)
         painter.setPen(pen)
-        for p1, p2 in self.green_lines:
+        for p1, p2, progress in self.green_lines:
+            if progress < 1.0:
+                p2 = QPoint(int(p1.x() + (p2.x() - p1.x()) * progress),
+                            int(p1.y() + (p2.y() - p1.y()) * progress))
             painter.drawLine(p1, p2)
 
         if self.red_line:
@@ -106,78 +227,45 @@ class LineCanvas(QWidget):
         painter.end()
 
 
-class LineState:
-    def __init__(self, cards, cards_per_batch, on_batch_done, on_game_done, on_move, on_correct, on_wrong, wrong_ms=800):
-        self.cards           = cards
-        self.cards_per_batch = cards_per_batch
-        self.on_batch_done   = on_batch_done
-        self.on_game_done    = on_game_done
-        self.on_move         = on_move
-        self.on_correct      = on_correct
-        self.on_wrong        = on_wrong
-        self.card1           = None
-        self.card2           = None
-        self.input_locked    = False
-        self.batch_index     = 0
-        self.pairs_up        = 0
-        self.wrong_ms        = wrong_ms
-        self.moves           = 0
-        self.correct_moves   = 0
-
-    def load_batch(self):
-        if self.batch_index >= len(self.cards):
-            self.on_game_done()
-            return
-
-        batch             = self.cards[self.batch_index: self.batch_index + self.cards_per_batch]
-        self.batch_index += len(batch)
-        self.pairs_up     = len(batch) // 2
-        self.card1        = None
-        self.card2        = None
-        self.input_locked = False
-        self.on_batch_done(batch)
+class LineState(BaseState):
+    def __init__(self, cards, cards_per_batch, on_batch_done, on_game_done, on_move, on_correct, on_wrong, wrong_ms=800, schedule=None, on_input=None, gap=1):
+        super().__init__(
+            cards           = cards,
+            cards_per_batch = cards_per_batch,
+            on_batch_done   = on_batch_done,
+            on_game_done    = on_game_done,
+            on_move         = on_move,
+            schedule        = schedule,
+            on_input        = on_input,
+            gap             = gap,
+        )
+        self.on_correct = on_correct
+        self.on_wrong   = on_wrong
+        self.wrong_ms   = wrong_ms
 
     def put_card(self, label):
-        if self.input_locked:
-            return
-
-        if self.card1 is None:
-            self.card1 = label
-            label.set_selected()
-            return
-
-        if label.side == self.card1.side:
+        # Picking another card on the same side moves the selection instead
+        # of counting a move.
+        if not self.input_locked and self.card1 is not None and label.side == self.card1.side:
             self.card1.deselect()
-            self.card1 = label
-            label.set_selected()
-            return
+            self.card1 = None
+        super().put_card(label)
 
-        self.card2        = label
-        self.input_locked = True
+    def _on_select_first(self, label):
+        label.set_selected()
+
+    def _on_select_second(self, label):
         label.set_selected()
-        self.moves += 1
-        self.on_move()
-        self._check_match()
 
     def _check_match(self):
-        if self.card1.pair_id == self.card2.pair_id:
+        if self._pair_ids_match():
             self.card1.set_matched()
             self.card2.set_matched()
             self.on_correct(self.card1, self.card2)
-            self.correct_moves += 1
-            self.card1        = None
-            self.card2        = None
-            self.pairs_up    -= 1
-            self.input_locked = False
-
-            if self.pairs_up == 0:
-                QTimer.singleShot(500, self.load_batch)
+            self._after_correct()
         else:
-            c1, c2     = self.card1, self.card2
-            self.card1 = None
-            self.card2 = None
-            self.on_wrong(c1, c2)
-            QTimer.singleShot(self.wrong_ms, lambda: self._reset_after_wrong(c1, c2))
+            self.on_wrong(self.card1, self.card2)
+            self._after_wrong(self.card1, self.card2, self.wrong_ms, self._reset_after_wrong)
 
     def _reset_after_wrong(self, c1, c2):
         c1.deselect()
@@ -185,10 +273,11 @@ class LineState:
         self.input_locked = False
 
 
-class LineMatchGame(QDialog):
+class LineMatchGame(BaseGameDialog):
     def __init__(self, deck_name: str):
-        super().__init__(mw)
+        super().__init__("line_match", deck_name)
         self.deck_name = deck_name
+        self.demand    = None
         self.setWindowTitle("Line Match")
         self.showMaximized()
 
@@ -196,35 +285,40 @@ class LineMatchGame(QDialog):
         number_of_pairs = cfg["numberOfPairs"]
         wrong_ms        = cfg["line_wrong_ms"]
 
-        pairs      = load_pairs(deck_name)
-        all_labels = self._pairs_to_labels(pairs)
+        self.pairs  = self.session["pairs"] if self.session else open_pairs(deck_name, number_of_pairs)
+        all_labels  = CardPool([group for _, _, group in self.pairs], 2, self._make_label, self.disown)
 
         self._load_ui()
 
+        if cfg["auto_layout"]:
+            texts       = [text for front, back, _ in self.pairs for text in (front, back)]
+            self.demand = TextDemand(texts, self.font().family(), LINE_TEXT_PX, self.rng)
+            self._fit_layout()
+            number_of_pairs = self.fit[0]
+
         self.wrong_ms = wrong_ms
         self.state = LineState(
             cards           = all_labels,
             cards_per_batch = number_of_pairs * 2,
-            on_batch_done   = self._build_columns,
+            on_batch_done   = self.perf.timed("build", self._build_columns),
             on_game_done    = self._finish,
             on_move         = self._count_move,
             on_correct      = self._on_correct,
             on_wrong        = self._on_wrong,
             wrong_ms        = wrong_ms,
+            schedule        = self.after,
+            on_input        = self.probe.begin,
+            gap             = cfg["requeue_gap"],
         )
 
-        self.state.load_batch()
+        self.put_card = self.perf.timed("move", self.state.put_card)
+        self._start_game()
 
-    def _pairs_to_labels(self, pairs):
-        labels = []
-        for i, (front, back) in enumerate(pairs):
-            left       = LineLabel(text=front, pair_id=i, on_click=None)
-            right      = LineLabel(text=back,  pair_id=i, on_click=None)
-            left.side  = "left"
-            right.side = "right"
-            labels.append(left)
-            labels.append(right)
-        return labels
+    def _make_label(self, i):
+        front, back, group = self.pairs[i // 2]
+        label      = self.own(LineLabel(text=back if i % 2 else front, pair_id=group, on_click=None))
+        label.side = "right" if i % 2 else "left"
+        return label
 
     def _load_ui(self):
         self.main_layout = QVBoxLayout()
@@ -235,6 +329,7 @@ class LineMatchGame(QDialog):
 
         back_btn = QPushButton("← Back")
         back_btn.setStyleSheet("font-size: 14px; color: white; background: #455A64; border-radius: 6px; padding: 4px 10px;")
+        back_btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         qconnect(back_btn.clicked, self._go_back)
         top.addWidget(back_btn)
 
@@ -257,6 +352,10 @@ class LineMatchGame(QDialog):
         self.game_area_layout.setContentsMargins(40, 10, 40, 10)
         self.game_area_layout.setSpacing(80)
 
+        self.columns     = {"left": [], "right": []}
+        self.cursor_side = "left"
+        self.cursor_row  = 0
+
         self.left_col  = QVBoxLayout()
         self.right_col = QVBoxLayout()
         self.left_col.setSpacing(12)
@@ -268,27 +367,51 @@ class LineMatchGame(QDialog):
         self.main_layout.addWidget(self.game_area, 1)
         self.setLayout(self.main_layout)
 
-        self.canvas = LineCanvas(self)
+        self.canvas          = LineCanvas(self)
+        self.canvas.animator = self.animator
+        self.canvas.draw_ms  = self.animation_ms
+        self.animator.add_timer(self.canvas.red_timer)
         self.canvas.raise_()
         self.canvas.show()
 
         self.seconds = 0
-        self.clock   = QTimer()
+        self.clock   = QTimer(self)
         self.clock.setInterval(1000)
         qconnect(self.clock.timeout, self._tick)
+        self.animator.add_timer(self.clock)
         self.clock.start()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if hasattr(self, "canvas"):
             self.canvas.setGeometry(self.rect())
+        if getattr(self, "demand", None):
+            self._fit_layout()
+
+    def _fit_layout(self):
+        # Runs on every resize. The columns on screen keep their rows; the
+        # new fit applies from the next batch.
+        outer   = self.main_layout.contentsMargins()
+        inner   = self.game_area_layout.contentsMargins()
+        width   = (self.width() - outer.left() - outer.right() - inner.left() - inner.right()
+                   - self.game_area_layout.spacing()) // 2
+        height  = (self.height() - outer.top() - outer.bottom() - inner.top() - inner.bottom()
+                   - self.moves_label.sizeHint().height() - self.main_layout.spacing())
+        label_w = max(150, min(AUTO_LINE_MAX_W, width))
+        rows, row_h = fit_rows(self.demand, label_w, height, self.left_col.spacing(),
+                               LINE_LABEL_PAD, LINE_MIN_H, AUTO_LINE_ROWS)
+        self.fit = (rows, label_w, max(LINE_MIN_H, row_h))
+        if hasattr(self, "state"):
+            self.state.cards_per_batch = rows * 2
 
     def _build_columns(self, batch):
         for col in [self.left_col, self.right_col]:
             while col.count():
                 item = col.takeAt(0)
                 if item.widget():
-                    item.widget().deleteLater()
+                    item.widget().set_cursor(False)
+                    item.widget().hide()
+                    item.widget().drop_face()
 
         self.canvas.clear_all()
         self.canvas.raise_()
@@ -296,20 +419,97 @@ class LineMatchGame(QDialog):
         lefts  = batch[0::2]
         rights = batch[1::2]
 
-        random.shuffle(lefts)
-        random.shuffle(rights)
+        if not self.restoring:
+            self.rng.shuffle(lefts)
+            self.rng.shuffle(rights)
+
+        for lbl in lefts + rights:
+            if self.demand:
+                lbl.setMaximumSize(self.fit[1], self.fit[2])
+            lbl.reset()
+            lbl.on_click = self.put_card
+            lbl.animator = self.animator
+            lbl.probe    = self.probe
+            lbl.fade_ms  = self.animation_ms * 2
+
+        for column in [lefts, rights]:
+            for row, lbl in enumerate(column):
+                lbl.hotkey = str((row + 1) % 10) if row < 10 else ""
+
+        self.columns     = {"left": lefts, "right": rights}
+        self.cursor_side = "left"
+        self.cursor_row  = 0
+        if lefts:
+            lefts[0].set_cursor(True)
 
         for lbl in lefts:
-            lbl.on_click = self.state.put_card
             self.left_col.addWidget(lbl)
+            lbl.show()
 
         for lbl in rights:
-            lbl.on_click = self.state.put_card
             self.right_col.addWidget(lbl)
+            lbl.show()
 
         self.left_col.addStretch()
         self.right_col.addStretch()
 
+        matched = [lbl for lbl in lefts if self.state.is_matched(lbl)]
+        if matched:
+            for lbl in lefts + rights:
+                if self.state.is_matched(lbl):
+                    lbl.set_matched()
+            self.after(0, lambda: self._redraw_lines(matched))
+
+    def _redraw_lines(self, lefts):
+        rights = {lbl.pair_id: lbl for lbl in self.columns["right"] if self.state.is_matched(lbl)}
+        for lbl in lefts:
+            if lbl.pair_id in rights:
+                self._on_correct(lbl, rights.pop(lbl.pair_id))
+
+    def _handle_key(self, key, text):
+        column = self.columns[self.cursor_side]
+        if not column:
+            return False
+
+        if len(text) == 1 and text in "0123456789":
+            row = (int(text) - 1) % 10
+            if row < len(column):
+                self._move_cursor(self.cursor_side, row)
+                self._select_cursor()
+            return True
+
+        if key in (Qt.Key.Key_Up, Qt.Key.Key_Down):
+            step = -1 if key == Qt.Key.Key_Up else 1
+            self._move_cursor(self.cursor_side, max(0, min(len(column) - 1, self.cursor_row + step)))
+            return True
+
+        if key in (Qt.Key.Key_Left, Qt.Key.Key_Right):
+            side = "left" if key == Qt.Key.Key_Left else "right"
+            self._move_cursor(side, min(self.cursor_row, len(self.columns[side]) - 1))
+            return True
+
+        if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Space):
+            self._select_cursor()
+            return True
+
+        return False
+
+    def _move_cursor(self, side, row):
+        self.columns[self.cursor_side][self.cursor_row].set_cursor(False)
+        self.cursor_side = side
+        self.cursor_row  = row
+        self.columns[side][row].set_cursor(True)
+
+    def _select_cursor(self):
+        label = self.columns[self.cursor_side][self.cursor_row]
+        if label.is_matched:
+            return
+        self.put_card(label)
+
+        if self.state.card1 is not None:
+            other = "right" if self.state.card1.side == "left" else "left"
+            self._move_cursor(other, min(self.cursor_row, len(self.columns[other]) - 1))
+
     def _on_correct(self, c1, c2):
         p1 = c1.get_center(self.canvas)
         p2 = c2.get_center(self.canvas)
@@ -321,11 +521,18 @@ class LineMatchGame(QDialog):
         self.canvas.flash_red(p1, p2, self.wrong_ms)
 
     def _count_move(self):
-        self.moves_label.setText(f"Moves: {self.state.moves}")
+        self.animator.set_text(self.moves_label, f"Moves: {self.state.moves}")
 
     def _tick(self):
         self.seconds += 1
-        self.time_label.setText(f"Time: {self.seconds}s")
+        self.animator.set_text(self.time_label, f"Time: {self.seconds}s")
+
+    def _refresh_hud(self):
+        self._count_move()
+        self.animator.set_text(self.time_label, f"Time: {self.seconds}s")
+
+    def _layout(self):
+        return [lbl for row in zip(self.columns["left"], self.columns["right"]) for lbl in row]
 
     def _go_back(self):
         self.clock.stop()
@@ -333,6 +540,8 @@ class LineMatchGame(QDialog):
 
     def _finish(self):
         self.clock.stop()
+        self.animator.stop()
+        self.columns = {"left": [], "right": []}
 
         for col in [self.left_col, self.right_col]:
             while col.count():
@@ -381,5 +590,14 @@ class LineMatchGame(QDialog):
         self.game_area_layout.addWidget(win)
 
     def _play_again(self):
+        self.play_again = True
         self.accept()
-        LineMatchGame(self.deck_name).exec()
\ No newline at end of file
+
+    def _release(self, widget):
+        widget.on_click = None
+        widget.animator = None
+        widget.probe    = None
+
+    def _teardown(self):
+        super()._teardown()
+        self.state.cards = []
\ No newline at end of file
@@ -0,0 +1,218 @@
+from collections import deque
+from .utils import load_config, make_win_widget
+from .game_pack import open_pairs
+from .base_dialog import BaseGameDialog
+from .line_match import LineLabel, LineMatchGame, LineState
+
+RUSH_ROW_H = 84
+RUSH_ROW_W = 300
+
+
+class RushFeed:
+    # Endless source of pairs for the rush board. Pairs cycle through a deque:
+    # one matched cleanly goes to the back, one missed while on the board comes
+    # back after `gap` other pairs. Pairs whose group is already on the board
+    # are skipped, so every match on screen is unambiguous. The feed only holds
+    # pair indices, so its size never changes during a game.
+    def __init__(self, groups: list, gap: int, rng):
+        order          = list(range(len(groups)))
+        rng.shuffle(order)
+        self.groups    = groups
+        self.gap       = max(0, gap)
+        self.queue     = deque(order)
+        self.on_board  = set()
+        self.missed    = set()
+        self.misses    = [0] * len(groups)
+        self.remaining = len(groups)
+
+    def miss(self, pair: int):
+        self.missed.add(pair)
+
+    def take(self):
+        skipped = []
+        pair    = None
+        while self.queue:
+            candidate = self.queue.popleft()
+            if self.groups[candidate] not in self.on_board:
+                pair = candidate
+                break
+            skipped.append(candidate)
+        self.queue.extendleft(reversed(skipped))
+
+        if pair is not None:
+            self.on_board.add(self.groups[pair])
+        return pair
+
+    def release(self, pair: int):
+        self.on_board.discard(self.groups[pair])
+        if pair in self.missed:
+            self.missed.discard(pair)
+            self.misses[pair] += 1
+            self.queue.insert(min(len(self.queue), self.gap), pair)
+        else:
+            self.queue.append(pair)
+
+    def finish(self):
+        self.remaining = 0
+
+
+class RushState(LineState):
+    # Line Match moves without rounds: the slots are refilled from the feed
+    # by the game, so a match never ends a batch and a miss is keyed by the
+    # pair a slot currently holds.
+    def __init__(self, slots, feed, on_move, on_correct, on_wrong, wrong_ms=800, schedule=None, on_input=None):
+        super().__init__(
+            cards           = slots,
+            cards_per_batch = len(slots),
+            on_batch_done   = None,
+            on_game_done    = None,
+            on_move         = on_move,
+            on_correct      = on_correct,
+            on_wrong        = on_wrong,
+            wrong_ms        = wrong_ms,
+            schedule        = schedule,
+            on_input        = on_input,
+        )
+        self.scheduler = feed
+
+    def pair_of(self, label) -> int:
+        return label.pair
+
+    def _after_correct(self):
+        self.correct_moves += 1
+        self.card1          = None
+        self.card2          = None
+        self.input_locked   = False
+
+
+class LineRushGame(LineMatchGame):
+    # Line Match against the clock. The board is a fixed set of label slots
+    # built once. A matched pair fades, then its two slots take the next pair
+    # from the feed. The new back lands in a random right-hand slot and the
+    # back that was there moves into the freed one, so at most three labels
+    # change and the columns are never rebuilt.
+    def __init__(self, deck_name: str):
+        BaseGameDialog.__init__(self, "line_rush", deck_name)
+        self.deck_name = deck_name
+        self.demand    = None
+        self.setWindowTitle("Line Rush")
+        self.showMaximized()
+
+        cfg               = load_config(("numberOfPairs", 4), ("line_wrong_ms", 800), ("requeue_gap", 1),
+                                        ("rush_seconds", 60))
+        self.rush_seconds = cfg["rush_seconds"]
+        self.wrong_ms     = cfg["line_wrong_ms"]
+        self.pairs        = open_pairs(deck_name)
+        groups            = [group for _, _, group in self.pairs]
+        rows              = max(1, min(cfg["numberOfPairs"], len(set(groups))))
+
+        self._load_ui()
+        self.animator.set_text(self.time_label, f"Time: {self.rush_seconds}s")
+
+        self.feed  = RushFeed(groups, cfg["requeue_gap"] * rows, self.rng)
+        self.state = RushState(
+            slots      = [],
+            feed       = self.feed,
+            on_move    = self._count_move,
+            on_correct = self._on_correct,
+            on_wrong   = self._on_wrong,
+            wrong_ms   = self.wrong_ms,
+            schedule   = self.after,
+            on_input   = self.probe.begin,
+        )
+
+        self.put_card = self.perf.timed("move", self.state.put_card)
+        self.refill   = self.perf.timed("build", self._refill)
+        if not self.pairs:
+            self._finish()
+            return
+        self._build_board(rows)
+
+    def _build_board(self, rows):
+        lefts, rights = [], []
+        for side, column, layout in (("left", lefts, self.left_col), ("right", rights, self.right_col)):
+            for row in range(rows):
+                lbl          = self.own(LineLabel(text="", pair_id=-1, on_click=self.put_card))
+                lbl.side     = side
+                lbl.pair     = None
+                lbl.hotkey   = str((row + 1) % 10) if row < 10 else ""
+                lbl.animator = self.animator
+                lbl.probe    = self.probe
+                lbl.fade_ms  = self.animation_ms * 2
+                lbl.setFixedSize(RUSH_ROW_W, RUSH_ROW_H)
+                column.append(lbl)
+                layout.addWidget(lbl)
+            layout.addStretch()
+
+        dealt = [pair for pair in (self.feed.take() for _ in range(rows)) if pair is not None]
+        backs = list(dealt)
+        self.rng.shuffle(backs)
+        for lbl, pair in zip(lefts, dealt):
+            self._deal(lbl, pair, 0)
+        for lbl, pair in zip(rights, backs):
+            self._deal(lbl, pair, 1)
+
+        self.state.cards = lefts + rights
+        self.columns     = {"left": lefts, "right": rights}
+        self.cursor_side = "left"
+        self.cursor_row  = 0
+        lefts[0].set_cursor(True)
+
+    def _deal(self, lbl, pair, face):
+        lbl.pair = pair
+        lbl.set_face(self.pairs[pair][face], self.pairs[pair][2])
+
+    def _on_correct(self, c1, c2):
+        left, right = (c1, c2) if c1.side == "left" else (c2, c1)
+        self.after(self.animation_ms * 2, lambda: self.refill(left, right))
+
+    def _refill(self, left, right):
+        self.feed.release(left.pair)
+        pair = self.feed.take()
+
+        swappable = [
+            lbl for lbl in self.columns["right"]
+            if lbl is right or not (lbl.is_matched or lbl is self.state.card1)
+        ]
+        target = self.rng.choice(swappable)
+        if target is not right:
+            self._deal(right, target.pair, 1)
+        self._deal(target, pair, 1)
+        self._deal(left, pair, 0)
+
+    def _tick(self):
+        self.seconds += 1
+        left = max(0, self.rush_seconds - self.seconds)
+        self.animator.set_text(self.time_label, f"Time: {left}s")
+        if left == 0:
+            self._finish()
+
+    def _refresh_hud(self):
+        self._count_move()
+
+    def _suspend(self):
+        pass
+
+    def _pairs_played(self) -> int:
+        return self.state.correct_moves
+
+    def _finish(self):
+        self.clock.stop()
+        self.animator.stop()
+        self._cancel_pending()
+        self.feed.finish()
+        self.state.input_locked = True
+        self.columns = {"left": [], "right": []}
+
+        for col in [self.left_col, self.right_col]:
+            while col.count():
+                item = col.takeAt(0)
+                if item.widget():
+                    item.widget().hide()
+
+        self.canvas.clear_all()
+
+        accuracy = int((self.state.correct_moves / self.state.moves) * 100) if self.state.moves > 0 else 100
+        title    = f"Time's up! {self.state.correct_moves} pairs"
+        win      = make_win_widget(self.state.moves, self.seconds, accuracy, self.accept, self._play_again, title)
+        self.game_area_layout.addWidget(win)
@@ -1,11 +1,21 @@
-import random
+import math
 from dataclasses import dataclass
-from aqt.qt import (QDialog, QGridLayout, QVBoxLayout,
-                    QHBoxLayout, QLabel, QTimer, QSizePolicy, Qt, QPushButton, QWidget)
+from aqt.qt import (QGridLayout, QVBoxLayout, QHBoxLayout, QLabel, QTimer, QWIDGETSIZE_MAX,
+                    QSizePolicy, Qt, QPushButton, QWidget, QPainter, QPen, QColor)
 from aqt.utils import qconnect
-from aqt import mw
-from .utils import load_config, load_pairs, make_win_widget
-from .base_state import BaseState
+from .utils import load_config, make_win_widget
+from .game_pack import open_pairs
+from .base_state import BaseState, CardPool
+from .base_dialog import BaseGameDialog
+from .animation import Animation
+from .card_face import render_face
+from .auto_layout import TextDemand, fit_grid
+
+TILE_MAX_FONT_PX = 32
+TILE_TEXT_PX     = 18
+TILE_FACE_PAD    = 16
+AUTO_TILE_MIN_W  = 140
+AUTO_TILE_MIN_H  = 100
 
 
 @dataclass
@@ -20,9 +30,18 @@ class Tile:
 class TileButton(QLabel):
     def __init__(self, tile: Tile, putCard):
         super().__init__()
-        self.tile    = tile
-        self.putCard = putCard
-        self.pair_id = tile.pair_id
+        self.tile          = tile
+        self.putCard       = putCard
+        self.pair_id       = tile.pair_id
+        self.is_wrong      = False
+        self.animator      = None
+        self.probe         = None
+        self.has_cursor    = False
+        self.flip_ms       = 0
+        self._scale        = 1.0
+        self._color        = "#607D8B"
+        self._face_pending = False
+        self._showing_face = False
         self.setMinimumSize(200, 150)
         self.setMaximumSize(400, 300)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -34,35 +53,146 @@ class TileButton(QLabel):
         if not self.tile.is_Matched:
             self.putCard(self)
 
+    def paintEvent(self, event):
+        if self.probe:
+            self.probe.painted()
+
+        if self._scale >= 1.0:
+            super().paintEvent(event)
+            if self.has_cursor:
+                painter = QPainter(self)
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+                painter.setPen(QPen(QColor("#FFC107"), 4))
+                painter.drawRoundedRect(self.rect().adjusted(2, 2, -2, -2), 8, 8)
+                painter.end()
+            return
+
+        width   = int(self.width() * self._scale)
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(self._color))
+        painter.drawRoundedRect((self.width() - width) // 2, 0, width, self.height(), 8, 8)
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._showing_face:
+            self._show_face()
+
+    def reset(self):
+        if self.animator:
+            self.animator.finish(self)
+        self.tile.is_Matched = False
+        self.tile.is_flipped = False
+        self.is_wrong        = False
+        self._face_pending   = False
+        self._scale          = 1.0
+        self._render()
+
+    def set_cursor(self, on: bool):
+        self.has_cursor = on
+        self.update()
+
     def set_facedown(self):
         self.tile.is_flipped = False
-        self.setText("?")
-        self.setStyleSheet("background: #607D8B; color: white; font-size: 24px; font-weight: bold; border-radius: 8px;")
+        self.is_wrong        = False
+        self._flip()
 
     def set_flipped(self):
         self.tile.is_flipped = True
-        self.setText(self.tile.text)
-        self.setStyleSheet("background: #2196F3; color: white; font-size: 18px; border-radius: 8px;")
+        self._flip()
 
     def set_matched(self):
         self.tile.is_Matched = True
         self.tile.is_flipped = True
-        self.setText(self.tile.text)
-        self.setStyleSheet("background: #4CAF50; color: white; font-size: 18px; border-radius: 8px;")
+        if not self._face_pending:
+            self._render()
 
     def set_wrong(self):
-        self.setStyleSheet("background: #F44336; color: white; font-size: 18px; border-radius: 8px;")
+        self.is_wrong = True
+        if not self._face_pending:
+            self._render()
+
+    def _flip(self):
+        if self.animator is None or self.flip_ms <= 0:
+            self._render()
+            return
+
+        self._face_pending = True
+
+        def step(t):
+            if t >= 0.5 and self._face_pending:
+                self._face_pending = False
+                self._render()
+            self._scale = abs(1.0 - 2.0 * t)
+            self.update()
+
+        self.animator.start(Animation(self.flip_ms, step, key=self))
+
+    def _render(self):
+        if not self.tile.is_flipped:
+            self._showing_face = False
+            self.setText("?")
+            self._apply_style("#607D8B", "font-size: 24px; font-weight: bold;")
+            return
+
+        if not self._showing_face:
+            self._show_face()
+
+        if self.tile.is_Matched:
+            self._apply_style("#4CAF50", "font-size: 18px;")
+        elif self.is_wrong:
+            self._apply_style("#F44336", "font-size: 18px;")
+        else:
+            self._apply_style("#2196F3", "font-size: 18px;")
+
+    def _show_face(self):
+        self._showing_face = True
+        pad  = TILE_FACE_PAD // 2
+        rect = self.contentsRect().adjusted(pad, pad, -pad, -pad)
+        if rect.width() <= 0 or rect.height() <= 0:
+            return
+        self.setPixmap(render_face(self.tile.text, self.font().family(), rect.width(), rect.height(),
+                                   TILE_MAX_FONT_PX, self.devicePixelRatioF()))
+
+    def drop_face(self):
+        # Hidden tiles give their face pixmap back; the next flip renders it
+        # again from the face cache.
+        self._showing_face = False
+        self.clear()
+
+    def _apply_style(self, color: str, font: str):
+        self._color = color
+        self.setStyleSheet(f"background: {color}; color: white; {font} border-radius: 8px;")
 
 
 class State(BaseState):
-    def __init__(self, cards, numberOfCardsPerMemoryGrid, onBatchDone, onGameDone, onMove):
+    def __init__(self, cards, numberOfCardsPerMemoryGrid, onBatchDone, onGameDone, onMove, schedule=None, onInput=None, gap=1):
         super().__init__(
             cards           = cards,
             cards_per_batch = numberOfCardsPerMemoryGrid,
             on_batch_done   = onBatchDone,
             on_game_done    = onGameDone,
             on_move         = onMove,
+            schedule        = schedule,
+            on_input        = onInput,
+            gap             = gap,
         )
+        self.seen  = set()
+        self.known = False
+
+    def load_batch(self):
+        self.seen = set()
+        super().load_batch()
+
+    def snapshot(self, layout, keep: list = None) -> dict:
+        pos = self._positions(keep)
+        return {**super().snapshot(layout, keep), "seen": sorted(self._renumber(i, pos) for i in self.seen)}
+
+    def restore(self, data: dict):
+        self.seen = set(data.get("seen", []))
+        super().restore(data)
 
     def put_card(self, tileBtn):
         if self.input_locked:
@@ -72,11 +202,30 @@ class State(BaseState):
         super().put_card(tileBtn)
 
     def _on_select_first(self, card):
+        self.known = self._partner_seen(card)
+        self.seen.add(self.cards.index(card))
         card.set_flipped()
 
     def _on_select_second(self, card):
+        self.seen.add(self.cards.index(card))
         card.set_flipped()
 
+    def _partner_seen(self, card) -> bool:
+        for i in self.seen:
+            other = self.cards[i]
+            if other.pair_id == card.pair_id and other.tile.is_front != card.tile.is_front and not other.tile.is_Matched:
+                return True
+        return False
+
+    def _missed_cards(self, c1, c2):
+        # Turning up a tile whose partner has never been shown is exploration,
+        # not a lapse. A mismatch only counts against the first tile's pair,
+        # and only when its partner was already turned up earlier this round.
+        return (c1,) if self.known else ()
+
+    def _pair_ids_match(self):
+        return super()._pair_ids_match() and self.card1.tile.is_front != self.card2.tile.is_front
+
     def _check_match(self):
         if self._pair_ids_match():
             self.card1.set_matched()
@@ -95,38 +244,69 @@ class State(BaseState):
         self.input_locked = False
 
 
-class MemoryFlipGame(QDialog):
+class MemoryFlipGame(BaseGameDialog):
     def __init__(self, deckName: str):
-        super().__init__(mw)
+        super().__init__("memory_flip", deckName)
         self.deckName = deckName
-        cfg           = load_config(("rows", 4), ("cols", 4))
+        cfg           = load_config(("rows", 4), ("cols", 4), ("requeue_gap", 1), ("auto_layout", False))
         self.rows     = cfg["rows"]
         self.cols     = cfg["cols"]
+        self.auto     = cfg["auto_layout"]
+        self.demand   = None
         self.numberOfCardsPerMemoryGrid = self.rows * self.cols
         self.setWindowTitle("Memory Flip")
         self.showMaximized()
 
-        pairs       = load_pairs(deckName)
-        tileButtons = self._pairs_to_tile_buttons(pairs)
+        self.pairs  = self.session["pairs"] if self.session else open_pairs(deckName, self.numberOfCardsPerMemoryGrid // 2)
+        tileButtons = CardPool([group for _, _, group in self.pairs], 2, self._make_tile, self.disown)
 
         self._load_ui()
 
+        if self.auto:
+            texts       = [text for front, back, _ in self.pairs for text in (front, back)]
+            self.demand = TextDemand(texts, self.font().family(), TILE_TEXT_PX, self.rng)
+            self._fit_layout()
+
         self.state = State(
             cards                      = tileButtons,
             numberOfCardsPerMemoryGrid = self.numberOfCardsPerMemoryGrid,
-            onBatchDone                = self._build_grid,
+            onBatchDone                = self.perf.timed("build", self._build_grid),
             onGameDone                 = self._finish,
             onMove                     = self._count_move,
+            schedule                   = self.after,
+            onInput                    = self.probe.begin,
+            gap                        = cfg["requeue_gap"],
         )
 
-        self.state.load_batch()
-
-    def _pairs_to_tile_buttons(self, pairs):
-        tiles = []
-        for i, (front, back) in enumerate(pairs):
-            tiles.append(TileButton(Tile(text=front, pair_id=i, is_front=True),  putCard=None))
-            tiles.append(TileButton(Tile(text=back,  pair_id=i, is_front=False), putCard=None))
-        return tiles
+        self.put_card = self.perf.timed("move", self.state.put_card)
+        self._start_game()
+
+    def _make_tile(self, i):
+        front, back, group = self.pairs[i // 2]
+        is_front           = i % 2 == 0
+        tile = self.own(TileButton(Tile(text=front if is_front else back, pair_id=group, is_front=is_front), putCard=None))
+        if self.auto:
+            tile.setMinimumSize(AUTO_TILE_MIN_W, AUTO_TILE_MIN_H)
+            tile.setMaximumSize(QWIDGETSIZE_MAX, QWIDGETSIZE_MAX)
+        return tile
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if getattr(self, "demand", None):
+            self._fit_layout()
+
+    def _fit_layout(self):
+        # Runs on every resize. The grid on screen keeps its shape; the new
+        # fit applies from the next batch.
+        margins  = self.mainLayout.contentsMargins()
+        width    = self.width() - margins.left() - margins.right()
+        height   = (self.height() - margins.top() - margins.bottom()
+                    - self.movesLabel.sizeHint().height() - self.mainLayout.spacing())
+        self.fit = fit_grid(self.demand, width, height, self.gridLayout.spacing(), TILE_FACE_PAD,
+                            AUTO_TILE_MIN_W, AUTO_TILE_MIN_H)
+        self.numberOfCardsPerMemoryGrid = self.fit[0] * self.fit[1]
+        if hasattr(self, "state"):
+            self.state.cards_per_batch = self.numberOfCardsPerMemoryGrid
 
     def _load_ui(self):
         self.mainLayout = QVBoxLayout()
@@ -137,6 +317,7 @@ class MemoryFlipGame(QDialog):
 
         backBtn = QPushButton("← Back")
         backBtn.setStyleSheet("font-size: 14px; color: white; background: #455A64; border-radius: 6px; padding: 4px 10px;")
+        backBtn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         qconnect(backBtn.clicked, self._go_back)
         top.addWidget(backBtn)
 
@@ -153,46 +334,96 @@ class MemoryFlipGame(QDialog):
         top.addWidget(self.timeLabel)
         self.mainLayout.addLayout(top)
 
+        self.gridTiles  = []
+        self.cursor     = 0
         self.gridLayout = QGridLayout()
         self.gridLayout.setSpacing(10)
         self.mainLayout.addLayout(self.gridLayout, 1)
         self.setLayout(self.mainLayout)
 
         self.seconds = 0
-        self.clock   = QTimer()
+        self.clock   = QTimer(self)
         self.clock.setInterval(1000)
         qconnect(self.clock.timeout, self._tick)
+        self.animator.add_timer(self.clock)
         self.clock.start()
 
-    def _go_back(self):
-        self.clock.stop()
-        self.reject()
-
     def _build_grid(self, batch):
         while self.gridLayout.count():
             item = self.gridLayout.takeAt(0)
             if item.widget():
-                item.widget().deleteLater()
+                item.widget().set_cursor(False)
+                item.widget().hide()
+                item.widget().drop_face()
 
-        random.shuffle(batch)
+        if not self.restoring:
+            self.rng.shuffle(batch)
+
+        if self.auto:
+            self.rows, self.cols = self.fit
+        rows = max(self.rows, math.ceil(len(batch) / self.cols))
 
         for btn in batch:
-            btn.putCard = self.state.put_card
-            btn.set_facedown()
+            btn.putCard = self.put_card
+            btn.reset()
+            btn.animator = self.animator
+            btn.probe    = self.probe
+            btn.flip_ms  = self.animation_ms
+            if self.state.is_matched(btn):
+                btn.set_matched()
 
         i = 0
-        for x in range(self.rows):
+        for x in range(rows):
             for y in range(self.cols):
                 if i < len(batch):
                     self.gridLayout.addWidget(batch[i], x, y)
+                    batch[i].show()
                     i += 1
 
+        self.gridTiles = batch[:i]
+        self.cursor    = 0
+        if self.gridTiles:
+            self.gridTiles[0].set_cursor(True)
+
+    def _handle_key(self, key, text):
+        if not self.gridTiles:
+            return False
+
+        moves = {
+            Qt.Key.Key_Left:  -1,
+            Qt.Key.Key_Right:  1,
+            Qt.Key.Key_Up:    -self.cols,
+            Qt.Key.Key_Down:   self.cols,
+        }
+        if key in moves:
+            target = self.cursor + moves[key]
+            if 0 <= target < len(self.gridTiles):
+                self.gridTiles[self.cursor].set_cursor(False)
+                self.cursor = target
+                self.gridTiles[self.cursor].set_cursor(True)
+            return True
+
+        if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Space):
+            tile = self.gridTiles[self.cursor]
+            if not tile.tile.is_Matched:
+                self.put_card(tile)
+            return True
+
+        return False
+
     def _count_move(self):
-        self.movesLabel.setText(f"Moves: {self.state.moves}")
+        self.animator.set_text(self.movesLabel, f"Moves: {self.state.moves}")
 
     def _tick(self):
         self.seconds += 1
-        self.timeLabel.setText(f"Time: {self.seconds}s")
+        self.animator.set_text(self.timeLabel, f"Time: {self.seconds}s")
+
+    def _refresh_hud(self):
+        self._count_move()
+        self.animator.set_text(self.timeLabel, f"Time: {self.seconds}s")
+
+    def _layout(self):
+        return self.gridTiles
 
     def _go_back(self):
         self.clock.stop()
@@ -200,6 +431,8 @@ class MemoryFlipGame(QDialog):
 
     def _finish(self):
         self.clock.stop()
+        self.animator.stop()
+        self.gridTiles = []
 
         while self.gridLayout.count():
             item = self.gridLayout.takeAt(0)
@@ -211,5 +444,14 @@ class MemoryFlipGame(QDialog):
         self.gridLayout.addWidget(win, 0, 0)
 
     def _play_again(self):
+        self.play_again = True
         self.accept()
-        MemoryFlipGame(self.deckName).exec()
\ No newline at end of file
+
+    def _release(self, widget):
+        widget.putCard  = None
+        widget.animator = None
+        widget.probe    = None
+
+    def _teardown(self):
+        super()._teardown()
+        self.state.cards = []
\ No newline at end of file
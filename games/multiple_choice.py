@@ -0,0 +1,295 @@
+from dataclasses import dataclass
+from aqt.qt import (QGridLayout, QVBoxLayout, QHBoxLayout, QLabel, QTimer,
+                    QSizePolicy, Qt, QPushButton, QPainter, QPen, QColor)
+from aqt.utils import qconnect
+from .utils import load_config, make_win_widget
+from .base_state import BaseState
+from .base_dialog import BaseGameDialog
+from .game_pack import open_pairs
+from .distractors import index_for
+from .card_face import render_face
+
+PROMPT_MAX_FONT_PX = 40
+CHOICE_MAX_FONT_PX = 26
+
+
+@dataclass
+class Question:
+    front: str
+    back: str
+    pair_id: int
+
+
+class FaceLabel(QLabel):
+    def __init__(self, max_font_px: int):
+        super().__init__()
+        self.text_value  = ""
+        self.max_font_px = max_font_px
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    def set_face(self, text: str):
+        self.text_value = text
+        self._show_face()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._show_face()
+
+    def _show_face(self):
+        rect = self.contentsRect()
+        if not self.text_value or rect.width() <= 0 or rect.height() <= 0:
+            return
+        self.setPixmap(render_face(self.text_value, self.font().family(), rect.width(), rect.height(),
+                                   self.max_font_px, self.devicePixelRatioF()))
+
+
+class ChoiceButton(FaceLabel):
+    def __init__(self, hotkey: str, on_click):
+        super().__init__(CHOICE_MAX_FONT_PX)
+        self.hotkey   = hotkey
+        self.on_click = on_click
+        self.pair_id  = None
+        self.is_wrong = False
+        self.probe    = None
+        self.setMinimumSize(200, 80)
+        self.setMaximumHeight(200)
+        self._apply_style("default")
+
+    def mousePressEvent(self, event):
+        if self.on_click:
+            self.on_click(self)
+
+    def paintEvent(self, event):
+        if self.probe:
+            self.probe.painted()
+
+        super().paintEvent(event)
+        painter = QPainter(self)
+        painter.setPen(QPen(QColor("#aaa")))
+        painter.drawText(self.rect().adjusted(8, 4, -8, -4),
+                         Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft, self.hotkey)
+        painter.end()
+
+    def set_choice(self, text: str, pair_id):
+        self.pair_id  = pair_id
+        self.is_wrong = False
+        self._apply_style("default")
+        self.set_face(text)
+
+    def set_correct(self):
+        self._apply_style("correct")
+
+    def set_wrong(self):
+        self.is_wrong = True
+        self._apply_style("wrong")
+
+    def _apply_style(self, state: str):
+        styles = {
+            "default": "background-color: #2b2b2b; border: 2px solid #555; border-radius: 8px; padding: 10px;",
+            "correct": "background-color: #1a4a1a; border: 2px solid #4aff4a; border-radius: 8px; padding: 10px;",
+            "wrong":   "background-color: #4a1a1a; border: 2px solid #ff4a4a; border-radius: 8px; padding: 10px;",
+        }
+        self.setStyleSheet(styles[state])
+
+
+class ChoiceState(BaseState):
+    cards_per_pair = 1
+
+    def __init__(self, cards, cards_per_batch, on_batch_done, on_game_done, on_move, on_next,
+                 wrong_ms=800, schedule=None, on_input=None, gap=1):
+        super().__init__(
+            cards           = cards,
+            cards_per_batch = cards_per_batch,
+            on_batch_done   = on_batch_done,
+            on_game_done    = on_game_done,
+            on_move         = on_move,
+            schedule        = schedule,
+            on_input        = on_input,
+            gap             = gap,
+        )
+        self.on_next  = on_next
+        self.wrong_ms = wrong_ms
+        self.question = None
+
+    def put_card(self, choice):
+        if self.input_locked or choice.is_wrong or self.question is None:
+            return
+
+        if self.on_input:
+            self.on_input()
+
+        self.input_locked = True
+        self.moves       += 1
+        self.on_move()
+
+        if choice.pair_id == self.question.pair_id:
+            choice.set_correct()
+            self.matched.add(self.pair_of(self.question))
+            self.correct_moves += 1
+            self.pairs_up      -= 1
+            self.schedule(500, self.load_batch if self.pairs_up == 0 else self.on_next)
+        else:
+            choice.set_wrong()
+            self._miss(self.question)
+            self.schedule(self.wrong_ms, self._unlock)
+
+    def _unlock(self):
+        self.input_locked = False
+
+
+class MultipleChoiceGame(BaseGameDialog):
+    def __init__(self, deck_name: str):
+        super().__init__("multiple_choice", deck_name)
+        self.deck_name = deck_name
+        cfg            = load_config(("numberOfPairs", 4), ("choices", 4), ("line_wrong_ms", 800), ("requeue_gap", 1))
+        self.choices   = max(2, cfg["choices"])
+        self.setWindowTitle("Multiple Choice")
+        self.showMaximized()
+
+        self.pairs     = self.session["pairs"] if self.session else open_pairs(deck_name, cfg["numberOfPairs"])
+        self.index     = index_for(deck_name, self.pairs if self.session else None)
+        questions      = [Question(front=front, back=back, pair_id=group) for front, back, group in self.pairs]
+        self.questions = []
+        self.current   = 0
+
+        self._load_ui()
+
+        self.state = ChoiceState(
+            cards           = questions,
+            cards_per_batch = cfg["numberOfPairs"],
+            on_batch_done   = self.perf.timed("build", self._start_batch),
+            on_game_done    = self._finish,
+            on_move         = self._count_move,
+            on_next         = self._next_question,
+            wrong_ms        = cfg["line_wrong_ms"],
+            schedule        = self.after,
+            on_input        = self.probe.begin,
+            gap             = cfg["requeue_gap"],
+        )
+
+        self.put_card = self.perf.timed("move", self.state.put_card)
+        self._start_game()
+
+    def _load_ui(self):
+        self.main_layout = QVBoxLayout()
+        self.main_layout.setContentsMargins(20, 20, 20, 20)
+        self.main_layout.setSpacing(10)
+
+        top = QHBoxLayout()
+
+        back_btn = QPushButton("← Back")
+        back_btn.setStyleSheet("font-size: 14px; color: white; background: #455A64; border-radius: 6px; padding: 4px 10px;")
+        back_btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        qconnect(back_btn.clicked, self._go_back)
+        top.addWidget(back_btn)
+
+        self.deck_label  = QLabel(f"<b>{self.deck_name}</b>")
+        self.moves_label = QLabel("Moves: 0")
+        self.time_label  = QLabel("Time: 0s")
+
+        for lbl in [self.deck_label, self.moves_label, self.time_label]:
+            lbl.setStyleSheet("font-size: 16px; color: white;")
+
+        top.addWidget(self.deck_label)
+        top.addStretch()
+        top.addWidget(self.moves_label)
+        top.addWidget(self.time_label)
+        self.main_layout.addLayout(top)
+
+        self.prompt = FaceLabel(PROMPT_MAX_FONT_PX)
+        self.prompt.setMinimumHeight(160)
+        self.prompt.setStyleSheet("background-color: #1e3a5f; border-radius: 10px; padding: 16px;")
+        self.main_layout.addWidget(self.prompt, 2)
+
+        self.choice_grid = QGridLayout()
+        self.choice_grid.setSpacing(12)
+        self.buttons = []
+        for i in range(self.choices):
+            btn       = self.own(ChoiceButton(str((i + 1) % 10) if i < 10 else "", self._put_choice))
+            btn.probe = self.probe
+            self.buttons.append(btn)
+            self.choice_grid.addWidget(btn, i // 2, i % 2)
+        self.main_layout.addLayout(self.choice_grid, 3)
+        self.setLayout(self.main_layout)
+
+        self.seconds = 0
+        self.clock   = QTimer(self)
+        self.clock.setInterval(1000)
+        qconnect(self.clock.timeout, self._tick)
+        self.animator.add_timer(self.clock)
+        self.clock.start()
+
+    def _put_choice(self, choice):
+        self.put_card(choice)
+
+    def _start_batch(self, batch):
+        self.questions = batch
+        self.current   = len(self.state.matched) - 1
+        self._next_question()
+
+    def _next_question(self):
+        self.current += 1
+        question      = self.questions[self.current]
+        options       = [(question.back, question.pair_id)]
+        options      += [(back, None) for back in self.index.query(question.back, len(self.buttons) - 1, self.rng)]
+        self.rng.shuffle(options)
+
+        self.prompt.set_face(question.front)
+        for btn, option in zip(self.buttons, options + [("", None)] * len(self.buttons)):
+            btn.set_choice(*option)
+            btn.setVisible(bool(option[0]))
+
+        self.state.question     = question
+        self.state.input_locked = False
+
+    def _handle_key(self, key, text):
+        if len(text) != 1 or text not in "0123456789" or self.state.question is None:
+            return False
+        i = (int(text) - 1) % 10
+        if i < len(self.buttons) and self.buttons[i].isVisible():
+            self.put_card(self.buttons[i])
+        return True
+
+    def _count_move(self):
+        self.animator.set_text(self.moves_label, f"Moves: {self.state.moves}")
+
+    def _tick(self):
+        self.seconds += 1
+        self.animator.set_text(self.time_label, f"Time: {self.seconds}s")
+
+    def _refresh_hud(self):
+        self._count_move()
+        self.animator.set_text(self.time_label, f"Time: {self.seconds}s")
+
+    def _layout(self):
+        return self.questions
+
+    def _go_back(self):
+        self.clock.stop()
+        self.reject()
+
+    def _finish(self):
+        self.clock.stop()
+        self.animator.stop()
+        self.state.question = None
+
+        self.prompt.hide()
+        for btn in self.buttons:
+            btn.hide()
+
+        accuracy = int((self.state.correct_moves / self.state.moves) * 100) if self.state.moves > 0 else 100
+        win      = make_win_widget(self.state.moves, self.seconds, accuracy, self.accept, self._play_again)
+        self.main_layout.addWidget(win, 3)
+
+    def _play_again(self):
+        self.play_again = True
+        self.accept()
+
+    def _release(self, widget):
+        widget.on_click = None
+        widget.probe    = None
+
+    def _teardown(self):
+        super()._teardown()
+        self.state.cards = []
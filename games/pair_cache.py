@@ -0,0 +1,63 @@
+from anki.utils import ids2str
+from aqt import mw
+
+
+class PairCache:
+    # Prepared fields per note id plus the note ids each deck query returned.
+    # Any collection change bumps the generation; a deck is only re-queried and
+    # its notes' mod times re-checked the next time it is launched after a bump,
+    # and only notes whose mod moved are prepared again.
+    def __init__(self):
+        self.notes      = {}
+        self.queries    = {}
+        self.generation = 0
+
+    def note_ids(self, query: str) -> list:
+        day    = mw.col.sched.today
+        cached = self.queries.get(query)
+        if cached and cached[0] == self.generation and cached[1] == day:
+            return list(cached[2])
+
+        nids = list(mw.col.find_notes(query))
+        self._validate(nids)
+        self.queries[query] = (self.generation, day, nids)
+        return list(nids)
+
+    def pair(self, nid: int, prepare) -> tuple:
+        entry = self.notes.get(nid)
+        if entry is None:
+            note  = mw.col.get_note(nid)
+            entry = (note.mod, prepare(note.fields[0]), prepare(note.fields[1]))
+            self.notes[nid] = entry
+        return entry[1], entry[2]
+
+    def invalidate(self):
+        self.generation += 1
+
+    def clear(self):
+        self.notes   = {}
+        self.queries = {}
+        self.generation += 1
+
+    def on_operation(self, changes, handler):
+        if changes.note_text or changes.card or changes.deck or changes.notetype:
+            self.invalidate()
+
+    def on_notes_deleted(self, col, ids):
+        for nid in ids:
+            self.notes.pop(nid, None)
+        self.invalidate()
+
+    def on_collection_load(self, col):
+        self.clear()
+
+    def _validate(self, nids: list):
+        known = [nid for nid in nids if nid in self.notes]
+        if not known:
+            return
+        for nid, mod in mw.col.db.all(f"select id, mod from notes where id in {ids2str(known)}"):
+            if self.notes[nid][0] != mod:
+                del self.notes[nid]
+
+
+pair_cache = PairCache()
@@ -0,0 +1,92 @@
+import sys
+import time
+from .utils import append_jsonl, load_config
+from .card_face import CACHE_BYTES
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+LOG_NAME       = "perf.jsonl"
+LOG_SESSIONS   = 500
+# The face cache is allowed to fill up, so memory growth is budgeted as its
+# cap plus headroom for the widgets and pairs of a game.
+DEFAULT_BUDGET = {
+    "move_ms":       16,
+    "build_ms":      150,
+    "paint_ms":      16,
+    "rss_growth_mb": CACHE_BYTES // (1024 * 1024) + 32,
+}
+
+
+def rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class PerfRecorder:
+    # Opt-in timings for the widget-heavy paths: move handling, batch builds
+    # and window paints, plus peak RSS growth over the session. p95 of each is
+    # checked against perf_budget when the game closes.
+    def __init__(self, mode: str, deck_name: str):
+        cfg            = load_config(("perf_log", False), ("perf_budget", {}))
+        self.enabled   = cfg["perf_log"]
+        self.budget    = {**DEFAULT_BUDGET, **(cfg["perf_budget"] or {})}
+        self.mode      = mode
+        self.deck_name = deck_name
+        self.samples   = {"move": [], "build": [], "paint": []}
+        self.rss_start = rss_mb() if self.enabled else 0.0
+
+    def timed(self, kind: str, fn):
+        if not self.enabled:
+            return fn
+
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.samples[kind].append((time.perf_counter() - start) * 1000)
+
+        return wrapper
+
+    def add(self, kind: str, ms: float):
+        if self.enabled:
+            self.samples[kind].append(ms)
+
+    def summary(self) -> dict:
+        stats = {}
+        for kind, values in self.samples.items():
+            ordered = sorted(values)
+            stats[kind] = {
+                "count":  len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2], 2) if ordered else 0,
+                "p95_ms": round(ordered[int(len(ordered) * 0.95)], 2) if ordered else 0,
+                "max_ms": round(ordered[-1], 2) if ordered else 0,
+            }
+
+        growth      = round(rss_mb() - self.rss_start, 1)
+        regressions = [
+            f"{kind}_ms" for kind in stats
+            if stats[kind]["count"] and stats[kind]["p95_ms"] > self.budget[f"{kind}_ms"]
+        ]
+        if growth > self.budget["rss_growth_mb"]:
+            regressions.append("rss_growth_mb")
+
+        return {
+            "mode":          self.mode,
+            "deck":          self.deck_name,
+            "at":            int(time.time()),
+            "timings":       stats,
+            "rss_growth_mb": growth,
+            "budget":        self.budget,
+            "regressions":   regressions,
+        }
+
+    def save(self):
+        if not self.enabled or not any(self.samples.values()):
+            return
+        append_jsonl(LOG_NAME, self.summary(), LOG_SESSIONS)
@@ -0,0 +1,123 @@
+import heapq
+from collections import deque
+
+
+class SessionScheduler:
+    # Decides which pairs go into each batch. Pairs start in the fresh queue in
+    # load order. A pair missed during a batch waits `gap` batches in a due-time
+    # heap, then moves to a ready heap ordered by miss count and then by how long
+    # ago it was last missed. Every step is a heap or deque operation, so building
+    # a batch never re-sorts the remaining pairs. A pair is done once it has been
+    # matched in a batch without being missed.
+    def __init__(self, groups: list, gap: int = 1):
+        self.groups    = groups
+        self.gap       = max(0, gap)
+        self.fresh     = deque(range(len(groups)))
+        self.waiting   = []
+        self.ready     = []
+        self.misses    = [0] * len(groups)
+        self.batch_no  = 0
+        self.current   = []
+        self.missed    = set()
+        self.remaining = len(groups)
+
+    def done(self) -> bool:
+        self._settle()
+        return self.remaining == 0
+
+    def miss(self, pair: int):
+        self.missed.add(pair)
+
+    def live(self) -> list:
+        # Pairs that are not done yet, in load order.
+        pairs = set(self.fresh) | set(self.current)
+        pairs.update(entry[-1] for entry in self.waiting)
+        pairs.update(entry[-1] for entry in self.ready)
+        return sorted(pairs)
+
+    def snapshot(self, keep: list = None) -> dict:
+        # Pairs are renumbered by their position in `keep`, the pairs saved
+        # with the game. Heaps are re-heapified on restore.
+        pos = {pair: i for i, pair in enumerate(range(len(self.groups)) if keep is None else keep)}
+        return {
+            "fresh":     [pos[pair] for pair in self.fresh],
+            "waiting":   [(due, pos[pair]) for due, pair in self.waiting],
+            "ready":     [(misses, due, pos[pair]) for misses, due, pair in self.ready],
+            "misses":    [self.misses[pair] for pair in pos],
+            "batch_no":  self.batch_no,
+            "current":   [pos[pair] for pair in self.current],
+            "missed":    sorted(pos[pair] for pair in self.missed),
+            "remaining": self.remaining,
+        }
+
+    def restore(self, data: dict):
+        self.fresh     = deque(data["fresh"])
+        self.waiting   = [tuple(entry) for entry in data["waiting"]]
+        self.ready     = [tuple(entry) for entry in data["ready"]]
+        self.misses    = data["misses"]
+        self.batch_no  = data["batch_no"]
+        self.current   = data["current"]
+        self.missed    = set(data["missed"])
+        self.remaining = data["remaining"]
+        heapq.heapify(self.waiting)
+        heapq.heapify(self.ready)
+
+    def next_batch(self, size: int) -> list:
+        self._settle()
+        self.batch_no += 1
+        self._promote(self.batch_no)
+
+        batch  = []
+        groups = set()
+
+        def take(pair) -> bool:
+            if self.groups[pair] in groups:
+                return False
+            batch.append(pair)
+            groups.add(self.groups[pair])
+            return True
+
+        retry_slots = max(1, size // 2) if self.fresh else size
+        self._drain_heap(self.ready, lambda: len(batch) < retry_slots, take)
+        self._drain_fresh(size, batch, take)
+
+        if len(batch) < size and not self.fresh:
+            self._promote(float("inf"))
+        self._drain_heap(self.ready, lambda: len(batch) < size, take)
+
+        self.current = batch
+        return list(batch)
+
+    def _settle(self):
+        for pair in self.current:
+            if pair in self.missed:
+                self.misses[pair] += 1
+                heapq.heappush(self.waiting, (self.batch_no + self.gap + 1, pair))
+            else:
+                self.remaining -= 1
+        self.current = []
+        self.missed  = set()
+
+    def _promote(self, batch_no):
+        while self.waiting and self.waiting[0][0] <= batch_no:
+            due, pair = heapq.heappop(self.waiting)
+            heapq.heappush(self.ready, (-self.misses[pair], due, pair))
+
+    def _drain_heap(self, heap, has_room, take):
+        skipped = []
+        while heap and has_room():
+            entry = heapq.heappop(heap)
+            if not take(entry[-1]):
+                skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+    def _drain_fresh(self, size, batch, take):
+        skipped = []
+        scanned = 0
+        while self.fresh and len(batch) < size and scanned < size * 3:
+            pair     = self.fresh.popleft()
+            scanned += 1
+            if not take(pair):
+                skipped.append(pair)
+        self.fresh.extendleft(reversed(skipped))
@@ -0,0 +1,39 @@
+import json
+import os
+from aqt import mw
+from .utils import user_file
+from .game_pack import deck_stamp
+
+SESSION_VERSION = 2
+
+
+def session_path(mode: str, deck_name: str) -> str:
+    folder = user_file("sessions")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{mode}-{mw.col.decks.id_for_name(deck_name)}.json")
+
+
+def save_session(mode: str, deck_name: str, data: dict):
+    data = {**data, "version": SESSION_VERSION, "stamp": deck_stamp(mw.col.decks.id_for_name(deck_name))}
+    with open(session_path(mode, deck_name), "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def load_session(mode: str, deck_name: str):
+    path = session_path(mode, deck_name)
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if data.get("version") != SESSION_VERSION or data.get("stamp") != deck_stamp(mw.col.decks.id_for_name(deck_name)):
+        clear_session(mode, deck_name)
+        return None
+    return data
+
+
+def clear_session(mode: str, deck_name: str):
+    path = session_path(mode, deck_name)
+    if os.path.exists(path):
+        os.remove(path)
@@ -3,9 +3,11 @@ import os
 import html
 import json
 import random
+from collections import deque
 from aqt.qt import (QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QWidget, Qt)
 from aqt.utils import qconnect
 from aqt import mw
+from .pair_cache import pair_cache
 
 
 def load_config(*keys_and_defaults):
@@ -15,12 +17,31 @@ def load_config(*keys_and_defaults):
     return {key: config.get(key, default) for key, default in keys_and_defaults}
 
 
-def make_win_widget(moves: int, seconds: int, accuracy: int, on_close, on_play_again) -> QWidget:
+def user_file(name: str) -> str:
+    folder = os.path.join(os.path.dirname(os.path.dirname(__file__)), "user_files")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+
+def append_jsonl(name: str, record: dict, keep: int):
+    path = user_file(name)
+    try:
+        with open(path, "r") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        lines = []
+    lines.append(json.dumps(record))
+    with open(path, "w") as f:
+        f.write("\n".join(lines[-keep:]) + "\n")
+
+
+def make_win_widget(moves: int, seconds: int, accuracy: int, on_close, on_play_again,
+                    title_text: str = "You Won!") -> QWidget:
     win        = QWidget()
     win_layout = QVBoxLayout()
     win_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-    title = QLabel("You Won!")
+    title = QLabel(title_text)
     title.setAlignment(Qt.AlignmentFlag.AlignCenter)
     title.setStyleSheet("font-size: 48px; font-weight: bold; color: white;")
 
@@ -70,27 +91,129 @@ def prepare_field(field: str) -> str:
     return field
 
 
-def load_pairs(deck_name: str) -> list:
+def normalize_face(text: str) -> str:
+    text = re.sub(r'src="[^"]*/([^"/]+)"', r'src="\1"', text)
+    return re.sub(r'\s+', ' ', text).strip().casefold()
+
+
+class PairIndex:
+    # Groups pairs whose faces look the same so any equivalent match is accepted.
+    # Every face is hashed once and groups are merged with union-find, so building
+    # the index stays linear in the number of pairs.
+    def __init__(self):
+        self.pairs  = []
+        self.seen   = set()
+        self.faces  = {}
+        self.parent = []
+
+    def add(self, front: str, back: str) -> bool:
+        front_key = normalize_face(front)
+        back_key  = normalize_face(back)
+        if (front_key, back_key) in self.seen:
+            return False
+        self.seen.add((front_key, back_key))
+
+        group = len(self.parent)
+        self.parent.append(group)
+        for key in (front_key, back_key):
+            other = self.faces.get(key)
+            if other is None:
+                self.faces[key] = group
+            else:
+                self._union(other, group)
+
+        self.pairs.append((front, back, group))
+        return True
+
+    def grouped(self) -> list:
+        return [(front, back, self._find(group)) for front, back, group in self.pairs]
+
+    def _find(self, group: int) -> int:
+        root = group
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[group] != root:
+            self.parent[group], group = root, self.parent[group]
+        return root
+
+    def _union(self, a: int, b: int):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def spread_groups(pairs: list, batch_pairs: int) -> list:
+    # Reorders pairs so no batch of batch_pairs holds two pairs from the same group.
+    # Pairs that would clash wait in a per-group queue for the next batch.
+    if not batch_pairs:
+        return pairs
+
+    ordered = []
+    batch   = set()
+    waiting = {}
+
+    def emit(pair):
+        ordered.append(pair)
+        batch.add(pair[2])
+        if len(batch) == batch_pairs:
+            batch.clear()
+
+    def drain():
+        while waiting:
+            placed = False
+            for group in list(waiting):
+                if group in batch:
+                    continue
+                queue = waiting[group]
+                emit(queue.popleft())
+                placed = True
+                if not queue:
+                    del waiting[group]
+                if not batch:
+                    break
+            if not placed:
+                return
+
+    for pair in pairs:
+        if pair[2] in batch:
+            waiting.setdefault(pair[2], deque()).append(pair)
+            continue
+        emit(pair)
+        if not batch:
+            drain()
+
+    drain()
+    for queue in waiting.values():
+        ordered.extend(queue)
+    return ordered
+
+
+def load_pairs(deck_name: str, batch_pairs: int = 0) -> list:
     config           = load_config(("useReviewQueue", False), ("maxCards", None))
     use_review_queue = config["useReviewQueue"]
     max_cards        = config["maxCards"]
 
     query    = f'deck:"{deck_name}" is:due' if use_review_queue else f'deck:"{deck_name}"'
-    card_ids = mw.col.find_cards(query)
-    random.shuffle(card_ids)
+    note_ids = pair_cache.note_ids(query)
+    random.shuffle(note_ids)
+
+    index = PairIndex()
+    for nid in note_ids:
+        if max_cards is not None and len(index.pairs) >= max_cards:
+            break
+        front, back = pair_cache.pair(nid, prepare_field)
+        if front and back:
+            index.add(front, back)
+    return spread_groups(index.grouped(), batch_pairs)
 
-    if max_cards is not None:
-        card_ids = card_ids[:max_cards]
 
-    pairs = []
-    for card_id in card_ids:
-        card  = mw.col.get_card(card_id)
-        note  = card.note()
-        front = prepare_field(note.fields[0])
-        back  = prepare_field(note.fields[1])
+def load_deck_pairs(deck_name: str) -> list:
+    index = PairIndex()
+    for nid in pair_cache.note_ids(f'deck:"{deck_name}"'):
+        front, back = pair_cache.pair(nid, prepare_field)
         if front and back:
-            pairs.append((front, back))
-    return pairs
+            index.add(front, back)
+    return index.grouped()
 
 
 def check_deck_has_cards(deck_name: str) -> bool:
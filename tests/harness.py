@@ -0,0 +1,233 @@
+"""Offscreen harness for driving the games without Anki.
+
+The add-on's ``games`` package is copied into a temporary folder next to its
+own ``config.json``, so config overrides and ``user_files`` never touch the
+working tree. ``aqt.mw`` is replaced by a plain widget carrying a stub
+collection before any game module is imported. Games are played by a scripted
+player that calls ``put_card`` directly, and every pending delay is run at
+once instead of being waited for.
+"""
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+from types import SimpleNamespace
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import aqt
+from aqt.qt import QApplication, QEvent, QWidget, sip
+
+ROOT        = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DECK  = "Bench"
+BENCH_NOTES = 1500
+SOAK_DECK   = "Soak"
+SOAK_NOTES  = 40
+
+CONFIG = {
+    "rows":            4,
+    "cols":            4,
+    "numberOfPairs":   6,
+    "choices":         4,
+    "maxCards":        None,
+    "flip_delay_ms":   1,
+    "line_wrong_ms":   1,
+    "rush_seconds":    60,
+    "requeue_gap":     1,
+    "useReviewQueue":  False,
+    "game_packs":      False,
+    "resume_sessions": False,
+    "auto_layout":     False,
+    "perf_log":        True,
+    "animation_fps":   60,
+    "animation_ms":    0,
+}
+
+
+class StubNote:
+    def __init__(self, nid: int, front: str, back: str):
+        self.id     = nid
+        self.mod    = 1
+        self.fields = [front, back]
+
+
+class StubDecks:
+    def __init__(self):
+        self.ids = {}
+
+    def id_for_name(self, name: str) -> int:
+        return self.ids.setdefault(name, len(self.ids) + 1)
+
+    def deck_and_child_ids(self, did: int) -> list:
+        return [did]
+
+
+class StubDb:
+    def __init__(self, col):
+        self.col = col
+
+    def all(self, sql: str) -> list:
+        ids = [int(nid) for nid in re.findall(r"\d+", sql.split(" in ", 1)[1])]
+        return [(nid, self.col.notes[nid].mod) for nid in ids if nid in self.col.notes]
+
+    def first(self, sql: str):
+        nids = list(self.col.notes)
+        return (1, len(nids), sum(nids))
+
+
+class StubCollection:
+    # Just the parts of mw.col the games touch: note search and lookup, the
+    # notes mod-time query, deck ids, the media folder and the scheduler day.
+    def __init__(self, media_dir: str):
+        self.notes   = {}
+        self.by_deck = {}
+        self.decks   = StubDecks()
+        self.db      = StubDb(self)
+        self.media   = SimpleNamespace(dir=lambda: media_dir)
+        self.sched   = SimpleNamespace(today=0)
+
+    def add_deck(self, name: str, count: int, seed: int = 0):
+        rng   = random.Random(seed)
+        words = ["alpha", "river", "stone", "light", "quiet", "garden", "window", "paper", "summer"]
+        nids  = []
+        for i in range(count):
+            nid   = len(self.notes) + 1000
+            front = f"{name.lower()} term {i}"
+            back  = " ".join(rng.choice(words) for _ in range(rng.randint(1, 24))) + f" {i}"
+            self.notes[nid] = StubNote(nid, front, back)
+            nids.append(nid)
+        self.by_deck[name] = nids
+
+    def find_notes(self, query: str) -> list:
+        return list(self.by_deck.get(re.search(r'deck:"([^"]+)"', query).group(1), []))
+
+    def find_cards(self, query: str) -> list:
+        return self.find_notes(query)
+
+    def get_note(self, nid: int) -> StubNote:
+        return self.notes[nid]
+
+
+class StubMainWindow(QWidget):
+    def __init__(self, col):
+        super().__init__()
+        self.col = col
+
+
+def _install() -> str:
+    folder = tempfile.mkdtemp(prefix="ankigames-")
+    shutil.copytree(os.path.join(ROOT, "games"), os.path.join(folder, "games"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    with open(os.path.join(ROOT, "config.json"), "r") as f:
+        config = json.load(f)
+    config.update(CONFIG)
+    with open(os.path.join(folder, "config.json"), "w") as f:
+        json.dump(config, f)
+    sys.path.insert(0, folder)
+    return folder
+
+
+app    = QApplication.instance() or QApplication([])
+folder = _install()
+col    = StubCollection(os.path.join(folder, "media"))
+col.add_deck(BENCH_DECK, BENCH_NOTES, seed=1)
+col.add_deck(SOAK_DECK, SOAK_NOTES, seed=2)
+aqt.mw = StubMainWindow(col)
+
+from games.memory_flip import MemoryFlipGame
+from games.line_match import LineMatchGame
+from games.line_rush import LineRushGame
+from games.multiple_choice import MultipleChoiceGame
+
+GAMES = {
+    "memory_flip":     MemoryFlipGame,
+    "line_match":      LineMatchGame,
+    "line_rush":       LineRushGame,
+    "multiple_choice": MultipleChoiceGame,
+}
+
+
+def open_game(mode: str, deck_name: str):
+    game = GAMES[mode](deck_name)
+    app.processEvents()
+    return game
+
+
+def close(game):
+    # The same steps as run_game once exec() returns.
+    game.reject()
+    sip.delete(game)
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+    app.processEvents()
+
+
+def settle(game):
+    # Runs every pending delay now instead of waiting for it.
+    for _ in range(100):
+        if sip.isdeleted(game) or not game.pending:
+            break
+        for timer in list(game.pending):
+            timer.start(0)
+        app.processEvents()
+    app.processEvents()
+
+
+def play(game, moves: int, rng: random.Random, miss_rate: float = 0.25) -> int:
+    while game.state.moves < moves:
+        picks = _picks(game, rng, miss_rate)
+        if picks is None:
+            settle(game)
+            picks = _picks(game, rng, miss_rate)
+            if picks is None:
+                break
+        for card in picks:
+            game.put_card(card)
+        app.processEvents()
+        settle(game)
+    return game.state.moves
+
+
+def _picks(game, rng, miss_rate):
+    if hasattr(game, "gridTiles"):
+        return _memory_picks(game, rng, miss_rate)
+    if hasattr(game, "columns"):
+        return _line_picks(game, rng, miss_rate)
+    return _choice_picks(game, rng, miss_rate)
+
+
+def _memory_picks(game, rng, miss_rate):
+    tiles = [t for t in game.gridTiles if not t.tile.is_Matched and not t.tile.is_flipped]
+    if len(tiles) < 2:
+        return None
+    first    = rng.choice(tiles)
+    others   = [t for t in tiles if t is not first]
+    partners = [t for t in others if t.pair_id == first.pair_id and t.tile.is_front != first.tile.is_front]
+    if not partners or rng.random() < miss_rate:
+        return first, rng.choice(others)
+    return first, partners[0]
+
+
+def _line_picks(game, rng, miss_rate):
+    lefts  = [lbl for lbl in game.columns["left"] if not lbl.is_matched]
+    rights = [lbl for lbl in game.columns["right"] if not lbl.is_matched]
+    if not lefts or not rights or game.state.input_locked:
+        return None
+    first    = rng.choice(lefts)
+    partners = [lbl for lbl in rights if lbl.pair_id == first.pair_id]
+    if not partners or rng.random() < miss_rate:
+        return first, rng.choice(rights)
+    return first, partners[0]
+
+
+def _choice_picks(game, rng, miss_rate):
+    question = game.state.question
+    if question is None or game.state.input_locked:
+        return None
+    options = [btn for btn in game.buttons if btn.isVisible() and not btn.is_wrong]
+    answer  = [btn for btn in options if btn.pair_id == question.pair_id]
+    if not answer or rng.random() < miss_rate:
+        return (rng.choice(options),)
+    return (answer[0],)
@@ -0,0 +1,29 @@
+"""Scripted-play benchmark: fails when move, build or paint p95, or RSS growth,
+go over the perf budget (``perf.DEFAULT_BUDGET`` plus any ``perf_budget``
+overrides in config.json).
+
+Run with ``QT_QPA_PLATFORM=offscreen python -m pytest tests``.
+"""
+import json
+import random
+import pytest
+
+pytest.importorskip("aqt")
+
+import harness
+
+BENCH_MOVES = 2000
+
+
+@pytest.mark.parametrize("mode", ["memory_flip", "line_match"])
+def test_scripted_session_stays_within_budget(mode):
+    game  = harness.open_game(mode, harness.BENCH_DECK)
+    moves = harness.play(game, BENCH_MOVES, random.Random(7))
+    summary = game.perf.summary()
+    harness.close(game)
+
+    assert moves >= 1000
+    assert summary["timings"]["move"]["count"] >= moves
+    assert summary["timings"]["build"]["count"] > 0
+    assert summary["timings"]["paint"]["count"] > 0
+    assert not summary["regressions"], json.dumps(summary, indent=2)
@@ -0,0 +1,56 @@
+"""Soak test: opens, plays and closes every game mode hundreds of times and
+checks that live Python objects, widgets and QObject wrappers stay flat.
+
+Run with ``QT_QPA_PLATFORM=offscreen python -m pytest tests``.
+"""
+import gc
+import random
+import pytest
+
+pytest.importorskip("aqt")
+
+import harness
+from aqt.qt import QApplication, QObject
+
+WARMUP_CYCLES = 20
+SOAK_CYCLES   = 300
+SOAK_MOVES    = 12
+OBJECT_SLACK  = 500
+
+
+def cycle(mode: str, rng: random.Random):
+    game = harness.open_game(mode, harness.SOAK_DECK)
+    harness.play(game, SOAK_MOVES, rng)
+    harness.close(game)
+
+
+def counts() -> dict:
+    gc.collect()
+    objects = gc.get_objects()
+    return {
+        "python":   len(objects),
+        "qobjects": sum(1 for obj in objects if isinstance(obj, QObject)),
+        "widgets":  len(QApplication.allWidgets()),
+        "children": len(harness.aqt.mw.children()),
+    }
+
+
+def test_open_close_keeps_object_counts_flat():
+    rng   = random.Random(11)
+    modes = list(harness.GAMES)
+
+    for i in range(WARMUP_CYCLES):
+        cycle(modes[i % len(modes)], rng)
+    # The first isinstance() scan makes PyQt build method descriptors for
+    # every wrapped class it meets, so it is run once before counting.
+    counts()
+    before = counts()
+
+    for i in range(SOAK_CYCLES):
+        cycle(modes[i % len(modes)], rng)
+    after = counts()
+
+    assert after["widgets"] == before["widgets"], (before, after)
+    assert after["children"] == before["children"], (before, after)
+    assert after["qobjects"] == before["qobjects"], (before, after)
+    assert after["python"] - before["python"] <= OBJECT_SLACK, (before, after)
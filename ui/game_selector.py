@@ -21,10 +21,14 @@ class GameSelector(QDialog):
 
         self.radio_memory = QRadioButton("Memory Flip")
         self.radio_line   = QRadioButton("Line Match")
+        self.radio_rush   = QRadioButton("Line Rush (timed)")
+        self.radio_choice = QRadioButton("Multiple Choice")
         self.radio_memory.setChecked(True)
 
         main_layout.addWidget(self.radio_memory)
         main_layout.addWidget(self.radio_line)
+        main_layout.addWidget(self.radio_rush)
+        main_layout.addWidget(self.radio_choice)
 
         btn_layout = QHBoxLayout()
         cancel_btn = QPushButton("Cancel")
@@ -44,5 +48,12 @@ class GameSelector(QDialog):
             showWarning(f'No cards found in deck "{self.deck_name}".\nIf you have useReviewQueue enabled, there may be no cards due today.')
             return
 
-        self.chosen_mode = "memory_flip" if self.radio_memory.isChecked() else "line_match"
+        if self.radio_memory.isChecked():
+            self.chosen_mode = "memory_flip"
+        elif self.radio_line.isChecked():
+            self.chosen_mode = "line_match"
+        elif self.radio_rush.isChecked():
+            self.chosen_mode = "line_rush"
+        else:
+            self.chosen_mode = "multiple_choice"
         self.accept()
\ No newline at end of file
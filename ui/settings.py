@@ -49,6 +49,10 @@ class SettingsDialog(QDialog):
         self.pairs_spin.setRange(2, 20)
         self.pairs_spin.setValue(cfg.get("numberOfPairs", 4))
 
+        self.choices_spin = QSpinBox()
+        self.choices_spin.setRange(2, 8)
+        self.choices_spin.setValue(cfg.get("choices", 4))
+
         self.max_cards_spin = QSpinBox()
         self.max_cards_spin.setRange(0, 9999)
         self.max_cards_spin.setSpecialValueText("No limit")
@@ -66,9 +70,41 @@ class SettingsDialog(QDialog):
         self.line_wrong_spin.setSuffix(" ms")
         self.line_wrong_spin.setValue(cfg.get("line_wrong_ms", 800))
 
+        self.rush_spin = QSpinBox()
+        self.rush_spin.setRange(15, 600)
+        self.rush_spin.setSingleStep(15)
+        self.rush_spin.setSuffix(" s")
+        self.rush_spin.setValue(cfg.get("rush_seconds", 60))
+
+        self.anim_fps_spin = QSpinBox()
+        self.anim_fps_spin.setRange(10, 240)
+        self.anim_fps_spin.setSuffix(" fps")
+        self.anim_fps_spin.setValue(cfg.get("animation_fps", 60))
+
+        self.anim_ms_spin = QSpinBox()
+        self.anim_ms_spin.setRange(0, 1000)
+        self.anim_ms_spin.setSingleStep(20)
+        self.anim_ms_spin.setSuffix(" ms")
+        self.anim_ms_spin.setSpecialValueText("Off")
+        self.anim_ms_spin.setValue(cfg.get("animation_ms", 180))
+
+        self.requeue_gap_spin = QSpinBox()
+        self.requeue_gap_spin.setRange(0, 10)
+        self.requeue_gap_spin.setSuffix(" rounds")
+        self.requeue_gap_spin.setValue(cfg.get("requeue_gap", 1))
+
         self.review_queue_check = QCheckBox()
         self.review_queue_check.setChecked(cfg.get("useReviewQueue", False))
 
+        self.game_packs_check = QCheckBox()
+        self.game_packs_check.setChecked(cfg.get("game_packs", False))
+
+        self.auto_layout_check = QCheckBox()
+        self.auto_layout_check.setChecked(cfg.get("auto_layout", False))
+
+        self.resume_check = QCheckBox()
+        self.resume_check.setChecked(cfg.get("resume_sessions", True))
+
         self.error_label = QLabel("")
         self.error_label.setStyleSheet("color: #ff4a4a; font-size: 13px;")
         self.error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -76,10 +112,18 @@ class SettingsDialog(QDialog):
         form.addRow("Memory Flip rows:", self.rows_spin)
         form.addRow("Memory Flip cols:", self.cols_spin)
         form.addRow("Line Match pairs:", self.pairs_spin)
+        form.addRow("Multiple Choice options:", self.choices_spin)
         form.addRow("Max cards (0 = no limit):", self.max_cards_spin)
         form.addRow("Flip delay (wrong):", self.flip_delay_spin)
         form.addRow("Red line duration:", self.line_wrong_spin)
+        form.addRow("Line Rush time limit:", self.rush_spin)
+        form.addRow("Animation frame rate:", self.anim_fps_spin)
+        form.addRow("Animation length:", self.anim_ms_spin)
+        form.addRow("Missed pairs return after:", self.requeue_gap_spin)
         form.addRow("Review queue only:", self.review_queue_check)
+        form.addRow("Use game packs:", self.game_packs_check)
+        form.addRow("Size rounds to the window:", self.auto_layout_check)
+        form.addRow("Offer to resume unfinished games:", self.resume_check)
 
         btn_layout = QHBoxLayout()
         cancel_btn = QPushButton("Cancel")
@@ -108,15 +152,25 @@ class SettingsDialog(QDialog):
 
         max_cards_val = self.max_cards_spin.value()
 
-        write_config({
-            "rows":           rows,
-            "cols":           cols,
-            "numberOfPairs":  self.pairs_spin.value(),
-            "maxCards":       max_cards_val if max_cards_val > 0 else None,
-            "flip_delay_ms":  self.flip_delay_spin.value(),
-            "line_wrong_ms":  self.line_wrong_spin.value(),
-            "useReviewQueue": self.review_queue_check.isChecked(),
+        cfg = read_config()
+        cfg.update({
+            "rows":            rows,
+            "cols":            cols,
+            "numberOfPairs":   self.pairs_spin.value(),
+            "choices":         self.choices_spin.value(),
+            "maxCards":        max_cards_val if max_cards_val > 0 else None,
+            "flip_delay_ms":   self.flip_delay_spin.value(),
+            "line_wrong_ms":   self.line_wrong_spin.value(),
+            "rush_seconds":    self.rush_spin.value(),
+            "requeue_gap":     self.requeue_gap_spin.value(),
+            "useReviewQueue":  self.review_queue_check.isChecked(),
+            "game_packs":      self.game_packs_check.isChecked(),
+            "resume_sessions": self.resume_check.isChecked(),
+            "auto_layout":     self.auto_layout_check.isChecked(),
+            "animation_fps":   self.anim_fps_spin.value(),
+            "animation_ms":    self.anim_ms_spin.value(),
         })
+        write_config(cfg)
         self.accept()
 
 
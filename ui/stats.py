@@ -0,0 +1,110 @@
+import re
+from aqt.qt import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QPushButton
+)
+from aqt.utils import qconnect
+from aqt import mw
+from ..games import history
+
+MODE_NAMES = {
+    "memory_flip":     "Memory Flip",
+    "line_match":      "Line Match",
+    "line_rush":       "Line Rush",
+    "multiple_choice": "Multiple Choice",
+}
+
+
+def card_label(text: str) -> str:
+    plain = re.sub(r'<[^>]+>', '', text).strip()
+    if not plain and "<img" in text:
+        return "[image]"
+    return plain
+
+
+class StatsDialog(QDialog):
+    def __init__(self):
+        super().__init__(mw)
+        self.setWindowTitle("AnkiGames Stats")
+        self.resize(720, 640)
+        self._load_ui()
+        self._refresh()
+
+    def _load_ui(self):
+        main_layout = QVBoxLayout()
+        main_layout.setSpacing(12)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+
+        filter_row = QHBoxLayout()
+        self.deck_combo = QComboBox()
+        self.deck_combo.addItem("All decks", None)
+        for deck in history.decks():
+            self.deck_combo.addItem(deck, deck)
+        qconnect(self.deck_combo.currentIndexChanged, self._refresh)
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("All modes", None)
+        for mode, name in MODE_NAMES.items():
+            self.mode_combo.addItem(name, mode)
+        qconnect(self.mode_combo.currentIndexChanged, self._refresh)
+
+        filter_row.addWidget(QLabel("Deck:"))
+        filter_row.addWidget(self.deck_combo, 1)
+        filter_row.addWidget(QLabel("Trend mode:"))
+        filter_row.addWidget(self.mode_combo)
+
+        self.summary_table = self._make_table(["Deck", "Mode", "Games", "Finished", "Accuracy", "Sec / pair"])
+        self.trend_table   = self._make_table(["Month", "Games", "Accuracy", "Sec / pair"])
+        self.hardest_table = self._make_table(["Card", "Deck", "Misses", "Games missed in"])
+
+        close_btn = QPushButton("Close")
+        qconnect(close_btn.clicked, self.accept)
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        btn_layout.addWidget(close_btn)
+
+        main_layout.addLayout(filter_row)
+        main_layout.addWidget(QLabel("<b>Per deck and mode</b>"))
+        main_layout.addWidget(self.summary_table, 2)
+        main_layout.addWidget(QLabel("<b>Trend</b>"))
+        main_layout.addWidget(self.trend_table, 2)
+        main_layout.addWidget(QLabel("<b>Hardest cards</b>"))
+        main_layout.addWidget(self.hardest_table, 2)
+        main_layout.addLayout(btn_layout)
+        self.setLayout(main_layout)
+
+    def _make_table(self, headers: list) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def _fill(self, table: QTableWidget, rows: list):
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                table.setItem(r, c, QTableWidgetItem(str(value)))
+
+    def _refresh(self):
+        deck = self.deck_combo.currentData()
+        mode = self.mode_combo.currentData()
+
+        self._fill(self.summary_table, [
+            (d, MODE_NAMES.get(m, m), games, finished, f"{acc:.0f}%", f"{speed:.1f}")
+            for d, m, games, finished, acc, speed in history.summary(deck)
+        ])
+        self._fill(self.trend_table, [
+            (month, games, f"{acc:.0f}%", f"{speed:.1f}")
+            for month, games, acc, speed in history.trend(deck, mode)
+        ])
+        self._fill(self.hardest_table, [
+            (card_label(card), d, misses, games)
+            for card, d, misses, games in history.hardest_cards(deck)
+        ])
+
+
+def open_stats():
+    dialog = StatsDialog()
+    dialog.exec()